@@ -0,0 +1,68 @@
+import threading
+import numpy as np
+
+#Viewer adapter that takes the displays out of the physics loop:
+#
+#    viz = AsyncViewer(MeshcatVisualizer(model, collision_model, visual_model), fps=30)
+#    for k in range(N):
+#        ...
+#        viz.display(q)      # only stores q, never blocks
+#    viz.close()
+#
+#display() copies the configuration into a single slot and returns. A background thread wakes up `fps` times per
+#second and sends the latest configuration to the wrapped viewer; the configurations pushed in between are dropped.
+#The slot is a plain attribute swap (atomic under the GIL), so the physics loop never waits for the thread nor for
+#the websocket. Any other attribute is forwarded to the wrapped viewer.
+
+class AsyncViewer:
+
+    def __init__(self, viz, fps=30.):
+        self.viz = viz
+        self.period = 1/fps
+        self.latest = None     # (frame number, configuration) of the last display() call
+        self.pushed = 0        # configurations received by display()
+        self.published = 0     # configurations sent to the viewer
+        self.error = None      # exception raised by the viewer in the background thread, if any
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="AsyncViewer", daemon=True)
+        self._thread.start()
+
+    def display(self, q):
+        self.pushed += 1
+        self.latest = (self.pushed, np.array(q, dtype=float))
+
+    def _run(self):
+        last = 0
+        while not self._stop.wait(self.period):
+            latest = self.latest
+            if latest is None or latest[0] == last:
+                continue
+            last = latest[0]
+            try:
+                self.viz.display(latest[1])
+            except Exception as err:
+                self.error = err
+                return
+            self.published += 1
+
+    #configurations that were never sent to the viewer
+    @property
+    def dropped(self):
+        return self.pushed-self.published
+
+    #stops the thread after sending the last configuration
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        if self.latest is not None and self.error is None and self.published < self.pushed:
+            self.viz.display(self.latest[1])
+            self.published += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self.viz, name)
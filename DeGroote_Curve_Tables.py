@@ -0,0 +1,114 @@
+import numpy as np
+from math import log
+from DeGroote_Muscle_Utils import *
+
+#Precomputed cubic Hermite tables of the DeGroote characteristics, an opt-in replacement of the closed forms
+#in ode_DG, FV_calc, ode_DG_jac and FM_calc:
+#
+#    tables = DeGrooteCurveTables(npts=512)
+#    print(tables.max_error)
+#    set_curve_backend(tables)   # ... set_curve_backend() goes back to the closed forms
+#
+#Each table lives on a uniform grid, so locating the interval of a sample is O(1). Outside of its domain a
+#table falls back to the closed form.
+
+#Physiological domains of the tables
+l_MN_domain = (0.4, 1.8)
+l_TN_domain = ((1/kT)*log(c3/c1)+c2, 1.1)   #starts at the tendon slack length, where f_t has its kink
+FM_domain = (-0.5, 2.5)
+
+#Cubic Hermite interpolation of f on a uniform grid of n intervals over [x0, x1], using the analytic derivative df
+class HermiteTable:
+
+    def __init__(self, f, df, x0, x1, n):
+        self.f = f
+        self.df = df
+        self.x0 = x0
+        self.x1 = x1
+        self.n = n
+        self.h = (x1-x0)/n
+        self.inv_h = 1/self.h
+        x = np.linspace(x0, x1, n+1)
+        y = f(x)
+        dy = df(x)*self.h
+        #y(u) = c0 + c1*u + c2*u**2 + c3*u**3 on each interval, u in [0,1]; one contiguous row per coefficient
+        self.coefficients = np.ascontiguousarray([y[:-1], dy[:-1], 3*(y[1:]-y[:-1])-2*dy[:-1]-dy[1:], 2*(y[:-1]-y[1:])+dy[:-1]+dy[1:]])
+        self.coefficient_list = self.coefficients.T.tolist()
+
+    #interval index and local coordinate of the samples x, all inside the domain
+    def locate(self, x):
+        s = (x-self.x0)*self.inv_h
+        i = s.astype(np.intp)
+        np.minimum(i, self.n-1, out=i)
+        return i, s-i
+
+    def __call__(self, x):
+        if isinstance(x, float):
+            if not self.x0 <= x <= self.x1:
+                return self.f(x)
+            s = (x-self.x0)*self.inv_h
+            i = min(int(s), self.n-1)
+            u = s-i
+            c0, c1, c2, c3 = self.coefficient_list[i]
+            return c0+u*(c1+u*(c2+u*c3))
+        x = np.asarray(x, dtype=float)
+        if x.ndim == 0:
+            return self(float(x))
+        inside = (x >= self.x0) & (x <= self.x1)
+        if not inside.all():
+            y = np.empty_like(x)
+            y[inside] = self(x[inside])
+            y[~inside] = self.f(x[~inside])
+            return y
+        i, u = self.locate(x)
+        c0, c1, c2, c3 = self.coefficients
+        return c0.take(i)+u*(c1.take(i)+u*(c2.take(i)+u*c3.take(i)))
+
+    def derivative(self, x):
+        if isinstance(x, float):
+            if not self.x0 <= x <= self.x1:
+                return self.df(x)
+            s = (x-self.x0)*self.inv_h
+            i = min(int(s), self.n-1)
+            u = s-i
+            c0, c1, c2, c3 = self.coefficient_list[i]
+            return (c1+u*(2*c2+3*u*c3))*self.inv_h
+        x = np.asarray(x, dtype=float)
+        if x.ndim == 0:
+            return self.derivative(float(x))
+        inside = (x >= self.x0) & (x <= self.x1)
+        if not inside.all():
+            dy = np.empty_like(x)
+            dy[inside] = self.derivative(x[inside])
+            dy[~inside] = self.df(x[~inside])
+            return dy
+        i, u = self.locate(x)
+        c0, c1, c2, c3 = self.coefficients
+        return (c1.take(i)+u*(2*c2.take(i)+3*u*c3.take(i)))*self.inv_h
+
+    #largest absolute errors of the value and of the derivative against the closed forms, checked on a grid
+    #`refinement` times finer than the table
+    def max_error(self, refinement=16):
+        x = np.linspace(self.x0, self.x1, self.n*refinement+1)
+        return np.max(np.abs(self(x)-self.f(x))), np.max(np.abs(self.derivative(x)-self.df(x)))
+
+#The set of tables used by the DeGroote muscle model, with the interface of closed_form_curves
+class DeGrooteCurveTables:
+
+    def __init__(self, npts=512):
+        self.tables = {
+            "f_a": HermiteTable(f_a, df_a, l_MN_domain[0], l_MN_domain[1], npts),
+            "f_p": HermiteTable(f_p, df_p, l_MN_domain[0], l_MN_domain[1], npts),
+            "f_t": HermiteTable(f_t, df_t, l_TN_domain[0], l_TN_domain[1], npts),
+            "finv_v": HermiteTable(finv_v, dfinv_v, FM_domain[0], FM_domain[1], npts),
+        }
+        self.f_a = self.tables["f_a"]
+        self.df_a = self.tables["f_a"].derivative
+        self.f_p = self.tables["f_p"]
+        self.df_p = self.tables["f_p"].derivative
+        self.f_t = self.tables["f_t"]
+        self.df_t = self.tables["f_t"].derivative
+        self.finv_v = self.tables["finv_v"]
+        self.dfinv_v = self.tables["finv_v"].derivative
+        #name: (max abs error of the value, max abs error of the derivative)
+        self.max_error = {name: table.max_error() for name, table in self.tables.items()}
@@ -1,5 +1,6 @@
 from math import pi, sqrt, sin, sinh
 import numpy as np
+from types import SimpleNamespace
 
 #Parameters od the Hill model characteristics
 #Tendon force-lengh
@@ -35,10 +36,7 @@ d4=0.886
 
 #The tendon force-length characteristic : f_t
 def f_t(l_TN):
-    if c1*np.exp(kT*(l_TN-c2))-c3<0 :
-        return 0
-    else:
-        return c1*np.exp(kT*(l_TN-c2))-c3
+    return np.maximum(c1*np.exp(kT*(l_TN-c2))-c3, 0)
 
 #The active force-length characteristic : f_a
 def f_a(l_MN): #with l_M normalized fiber length
@@ -51,41 +49,139 @@ def f_a(l_MN): #with l_M normalized fiber length
 def f_p(l_MN):
     return (np.exp((kpe*(l_MN-1))/e0)-1)/(np.exp(kpe)-1)
 
+#Derivatives of the characteristics with respect to their argument
+def df_t(l_TN):
+    e = c1*np.exp(kT*(l_TN-c2))
+    return np.where(e-c3<0, 0, kT*e)
+
+def df_a(l_MN):
+    dS1=-b11*np.exp((-0.5*(l_MN-b21)**2)/(b31+b41*l_MN)**2)*(l_MN-b21)*(b31+b41*b21)/(b31+b41*l_MN)**3
+    dS2=-b12*np.exp((-0.5*(l_MN-b22)**2)/(b32+b42*l_MN)**2)*(l_MN-b22)*(b32+b42*b22)/(b32+b42*l_MN)**3
+    dS3=-b13*np.exp((-0.5*(l_MN-b23)**2)/(b33+b43*l_MN)**2)*(l_MN-b23)*(b33+b43*b23)/(b33+b43*l_MN)**3
+    return dS1+dS2+dS3
+
+def df_p(l_MN):
+    return (kpe/e0)*np.exp((kpe*(l_MN-1))/e0)/(np.exp(kpe)-1)
+
 #The velocity force-length characteristic : f__v
 def f_v(v_MN):
     v = d1*np.log((d2*v_MN+d3)+np.sqrt(((d2*v_MN+d3)**2)+1))+d4
     return v
 
+#The inverse force-velocity relation used by ode_DG, FM is saturated to keep sinh finite
+def finv_v(FM):
+    r=(1/d1)*(np.clip(FM, d4+710.47*d1, d4-710.47*d1)-d4)
+    return (1/d2)*np.sinh(r)-d3
+
+def dfinv_v(FM):
+    r=(1/d1)*(np.clip(FM, d4+710.47*d1, d4-710.47*d1)-d4)
+    return np.where((FM>d4-710.47*d1) | (FM<d4+710.47*d1), 0, np.cosh(r)/(d1*d2))
+
 #muscle-tendon length variation through time
 def calc_l_MT(t,l0_M,ls_T,alpha0,c2):
     c1 = ls_T + l0_M*(np.cos(alpha0))
     return c1 + c2*(np.sin(2*np.pi*t))
 
+#Curves used by FM_calc, ode_DG, FV_calc and ode_DG_jac: the closed forms above by default,
+#or interpolation tables (DeGroote_Curve_Tables) installed at runtime with set_curve_backend.
+#Each of these functions also takes an optional last argument `curves` overriding the backend for one call
+#(e.g. millard_curves of Millard_Muscle_Utils)
+closed_form_curves = SimpleNamespace(f_a=f_a, df_a=df_a, f_p=f_p, df_p=df_p, f_t=f_t, df_t=df_t, finv_v=finv_v, dfinv_v=dfinv_v)
+_curves = closed_form_curves
+
+def set_curve_backend(backend=None):
+    global _curves
+    _curves = closed_form_curves if backend is None else backend
+
+def get_curve_backend():
+    return _curves
+
 #muscle force
-def FM_calc(l_MN, a):
-    FM = a*f_a(l_MN)+f_p(l_MN)
+def FM_calc(l_MN, a, curves=None):
+    curves = _curves if curves is None else curves
+    FM = a*curves.f_a(l_MN)+curves.f_p(l_MN)
     return FM
 
 #differential equation inspired by DeGroote
-def ode_DG(t, l_MN, l_MT, a,l0_M,alpha0,ls_T,vmax_M):
+def ode_DG(t, l_MN, l_MT, a,l0_M,alpha0,ls_T,vmax_M,curves=None):
 
-    assert 0<alpha0 and alpha0<=pi/2
-    if l_MN**2-sin(alpha0)**2 <0:
-        sqt = sqrt(sin(alpha0)**2-l_MN**2)
-    else:
-        sqt = sqrt(l_MN**2-sin(alpha0)**2)
+    curves = _curves if curves is None else curves
+    assert np.all(0<alpha0) and np.all(alpha0<=pi/2)
+    sqt = np.sqrt(np.absolute(l_MN**2-np.sin(alpha0)**2))
 
-    l_T= l_MT -l0_M*(np.absolute(sqt))
+    l_T= l_MT -l0_M*sqt
     CosA=sqt/l_MN
 
-    A=a*f_a(l_MN)
-    B=f_t(l_T/ls_T)/CosA
-    C=f_p(l_MN)
+    A=a*curves.f_a(l_MN)
+    B=curves.f_t(l_T/ls_T)/CosA
+    C=curves.f_p(l_MN)
     FM=(B-C)/A
-    if FM>d4-710.47*d1:
-        FM=d4-710.47*d1
-    if FM<d4+710.47*d1:
-        FM=d4+710.47*d1
-    r=(1/d1)*(FM-d4)
-    finv_v=(1/d2)*sinh(r)-d3
-    return  (vmax_M/l0_M)*finv_v
+    return  (vmax_M/l0_M)*curves.finv_v(FM)
+
+#force-velocity multiplier FM=(B-C)/A required by the force balance of ode_DG, and its derivative with respect to l_MN
+def FV_calc(l_MN, l_MT, a,l0_M,alpha0,ls_T,curves=None):
+
+    curves = _curves if curves is None else curves
+    sin2 = np.sin(alpha0)**2
+    sqt = np.sqrt(np.absolute(l_MN**2-sin2))
+    dsqt = np.sign(l_MN**2-sin2)*l_MN/sqt
+
+    l_T = l_MT -l0_M*sqt
+    CosA = sqt/l_MN
+    dCosA = (dsqt*l_MN-sqt)/l_MN**2
+
+    A = a*curves.f_a(l_MN)
+    dA = a*curves.df_a(l_MN)
+    F_T = curves.f_t(l_T/ls_T)
+    dF_T = -curves.df_t(l_T/ls_T)*l0_M*dsqt/ls_T
+    B = F_T/CosA
+    dB = (dF_T*CosA-F_T*dCosA)/CosA**2
+    FM = (B-curves.f_p(l_MN))/A
+    dFM = (dB-curves.df_p(l_MN)-FM*dA)/A
+    return FM, dFM
+
+#analytic Jacobian d(dl_MN/dt)/dl_MN of ode_DG, evaluated elementwise
+def ode_DG_jac(t, l_MN, l_MT, a,l0_M,alpha0,ls_T,vmax_M,curves=None):
+    curves = _curves if curves is None else curves
+    FM, dFM = FV_calc(l_MN, l_MT, a, l0_M, alpha0, ls_T, curves)
+    return (vmax_M/l0_M)*(dFM*curves.dfinv_v(FM))
+
+#force-velocity multiplier at which ode_DG predicts a zero fiber velocity: finv_v(FM_iso)=0
+FM_iso = d4+d1*np.arcsinh(d2*d3)
+#normalized tendon slack length, below which f_t is zero
+l_TN_slack = (1/kT)*np.log(c3/c1)+c2
+
+#Static equilibrium of the fiber length for a muscle-tendon length l_MT: solves the force balance of ode_DG at zero
+#fiber velocity, f_t(l_T/ls_T)/CosA = FM_iso*a*f_a(l_MN) + f_p(l_MN), elementwise over broadcast arrays of muscles
+#and poses. The root is bracketed between the fiber length where CosA vanishes and max(1, length where the tendon
+#goes slack), beyond which the balance is always negative. Newton steps falling out of the bracket are replaced by
+#bisection, so the iteration always converges. Where the balance is already negative at the shortest fiber there
+#is no equilibrium, and that shortest fiber is returned.
+def equilibrate(l_MT, a, l0_M, alpha0, ls_T, l_MN=None, tol=1e-12, maxiter=60):
+    l_MT, a, l0_M, alpha0, ls_T = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (l_MT, a, l0_M, alpha0, ls_T)))
+    sin_alpha0 = np.sin(alpha0)
+    l_min = sin_alpha0*(1+1e-9)
+    sqt_slack = np.maximum((l_MT-ls_T*l_TN_slack)/l0_M, 0)
+    lo = l_min
+    hi = np.maximum(np.sqrt(sqt_slack**2+sin_alpha0**2), 1)
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        FM, dFM = FV_calc(l_min, l_MT, a, l0_M, alpha0, ls_T)
+        has_root = ~(FM-FM_iso <= 0)
+        if l_MN is None:
+            l = 0.5*(lo+hi)
+        else:
+            l = np.clip(np.broadcast_to(l_MN, lo.shape), lo, hi)
+        for _ in range(maxiter):
+            FM, dFM = FV_calc(l, l_MT, a, l0_M, alpha0, ls_T)
+            g = FM-FM_iso
+            #the root stays between lo (g>0) and hi (g<0)
+            lo = np.where(g > 0, l, lo)
+            hi = np.where(g > 0, hi, l)
+            step = g/dFM
+            converged = (np.abs(step) <= tol*l) | ~has_root
+            if np.all(converged):
+                break
+            l_new = l-step
+            l_new = np.where((l_new > lo) & (l_new < hi), l_new, 0.5*(lo+hi))
+            l = np.where(converged, l, l_new)
+    return np.where(has_root, l, l_min)[()]
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------
+#MILLARD MODEL
+#Compiled form of the Millard curves: the tuple returned by the curve constructors,
+#with everything that does not depend on x computed once
+#--------------------------------------------------------------------------------------
+import numpy as np
+from bisect import bisect_right
+from calcIndex import calcIndex
+from createSectionIndex import createSectionIndex
+from calc1DBezierCurveDerivatives import bezierPowerMatrix, calcBezierPowerBasisDerivatives
+from createBezierIntegralTable import createBezierIntegralTable, calcBezierIntegralPolynomial
+from calcBezierUFcnX import calcBezierUFcnX
+from calcBezierYFcnXDerivatives import calcBezierChainRule, calcBezierLinearExtrapolation
+
+class BezierCurve:
+
+    """ A Bezier spline curve y(x), built from the tuple
+     curveParams=(xpts,ypts,xEnd,yEnd,dydxEnd,d2ydx2End,integral) returned by
+     createFiberActiveForceLengthCurve, createFiberForceLengthCurve,
+     createFiberForceVelocityCurve2018, createTendonForceLengthCurve and
+     createInverseBezierCurve:
+
+        curve = BezierCurve(createTendonForceLengthCurve(...))
+        fT = curve(x)                            # y(x)
+        kT = curve.derivative(x, 1)              # as calcBezierYFcnXDerivative
+        yd, intYdx = curve.derivatives(x, 3)     # as calcBezierYFcnXDerivatives
+
+     In a time stepping loop, where x changes little between two steps, the
+     previous u is a good first guess of the next one:
+
+        col = curve.section(x)
+        u, iterations = curve.solveU(x, col, u if col == colOld else None)
+        y, dydx = curve.sectionDerivatives(u, col, 1)
+
+     It stores, as contiguous arrays:
+
+        starts, ends, dxSign, xmin, xmax : the section index of createSectionIndex
+        xCoefs, yCoefs : the power basis coefficients of x(u) and y(u) and of all
+                         their derivatives (bezierPowerMatrix), one column per
+                         section. The derivative control polygons are never
+                         recomputed.
+        xEnd, yEnd, dydxEnd : the coefficients of the linear extrapolation
+        integralCoefs, integralPrefix, integralMax : the exact integral of the
+                      curve, one polynomial in u per section
+                      (createBezierIntegralTable)
+
+     The evaluation functions accept a scalar or an array x."""
+
+    __slots__ = ('xpts', 'ypts', 'xEnd', 'yEnd', 'dydxEnd', 'd2ydx2End', 'integral',
+                 'order', 'starts', 'ends', 'dxSign', 'xmin', 'xmax', 'startsList', 'endsList',
+                 'xCoefs', 'yCoefs', 'xCoefsList', 'yCoefsList',
+                 'integralCoefs', 'integralCoefsList', 'integralPrefix', 'integralPrefixList', 'integralMax')
+
+    def __init__(self, curveParams):
+        xpts, ypts, xEnd, yEnd, dydxEnd, d2ydx2End, integral = curveParams
+        self.xpts = np.ascontiguousarray(xpts, dtype=float)
+        self.ypts = np.ascontiguousarray(ypts, dtype=float)
+        self.xEnd = np.array(xEnd, dtype=float).ravel()
+        self.yEnd = np.array(yEnd, dtype=float).ravel()
+        self.dydxEnd = np.array(dydxEnd, dtype=float).ravel()
+        self.d2ydx2End = np.array(d2ydx2End, dtype=float).ravel()
+        self.order = self.xpts.shape[0]-1
+
+        self.starts, self.ends, self.dxSign, self.xmin, self.xmax = createSectionIndex(self.xpts)
+        self.startsList = self.starts.tolist()
+        self.endsList = self.ends.tolist()
+
+        C = bezierPowerMatrix(self.order)[0]
+        self.xCoefs = np.ascontiguousarray(C.dot(self.xpts))
+        self.yCoefs = np.ascontiguousarray(C.dot(self.ypts.T))
+        self.xCoefsList = self.xCoefs.T.tolist()
+        self.yCoefsList = self.yCoefs.T.tolist()
+
+        self.integral = integral
+        self.integralCoefs, self.integralPrefix, self.integralMax = createBezierIntegralTable(self.xpts, self.ypts)
+        self.integralCoefsList = self.integralCoefs.T.tolist()
+        self.integralPrefixList = self.integralPrefix.tolist()
+
+    def params(self):
+
+        """The curve as the tuple (xpts,ypts,xEnd,yEnd,dydxEnd,d2ydx2End,integral)"""
+
+        return (self.xpts, self.ypts, self.xEnd, self.yEnd, self.dydxEnd, self.d2ydx2End, self.integral)
+
+    def section(self, x):
+
+        """Index of the section containing x (an array of indices for an array x)"""
+
+        if isinstance(x, float):
+            #calcIndex on Python floats
+            tol = 2.2204e-16
+            xReal = self.dxSign*x
+            col = bisect_right(self.startsList, xReal+tol)-1
+            if col >= 0 and self.startsList[col] > xReal and not abs(xReal-self.startsList[col]) < tol:
+                col = col-1
+            last = len(self.endsList)-1
+            assert col >= 0 and (xReal < self.endsList[col] or abs(xReal-self.endsList[col]) < tol or (col == last and xReal == self.endsList[last])),'Error: A value of xReal was used that is not within the Bezier curve set.'
+            return col
+        return calcIndex(x, (self.starts, self.ends, self.dxSign), [], 2.2204e-16)
+
+    def solveU(self, x, col, u0=None):
+
+        """Value of u at which x(u) = x on the section col (calcBezierUFcnX).
+         x and col are scalars, or arrays of the same shape. u0 is an optional
+         first guess, e.g. the u of the previous time step.
+
+         @returns (u, iterations)"""
+
+        if isinstance(x, float) or np.ndim(x) == 0:
+            return calcBezierUFcnX(x, self.xCoefsList[col], self.order, u0)
+        return calcBezierUFcnX(x, self.xCoefs[:, col], self.order, u0)
+
+    def sectionDerivatives(self, u, col, nder):
+
+        """[y, dy/dx, ..., d^nder y/dx^nder] at u on the section col"""
+
+        n = self.order
+        if isinstance(u, float) or np.ndim(u) == 0:
+            ydu = calcBezierPowerBasisDerivatives(u, self.yCoefsList[col], n, nder)
+            if nder == 0:
+                return ydu
+            xdu = calcBezierPowerBasisDerivatives(u, self.xCoefsList[col], n, nder)
+        else:
+            ydu = calcBezierPowerBasisDerivatives(u, self.yCoefs[:, col], n, nder)
+            if nder == 0:
+                return ydu
+            xdu = calcBezierPowerBasisDerivatives(u, self.xCoefs[:, col], n, nder)
+
+        return calcBezierChainRule(xdu, ydu, nder)
+
+    def sectionIntegral(self, u, col):
+
+        """Integral of the curve from xmin to x(u) on the section col"""
+
+        if isinstance(u, float) or np.ndim(u) == 0:
+            return self.integralPrefixList[col] + calcBezierIntegralPolynomial(u, self.integralCoefsList[col])
+        return self.integralPrefix[col] + calcBezierIntegralPolynomial(u, self.integralCoefs[:, col])
+
+    def integralExtrapolation(self, x):
+
+        """Integral of the curve beyond xmax, where the curve is linear"""
+
+        dx = x-self.xmax
+        return self.integralMax + float(self.yEnd[1])*dx + 0.5*float(self.dydxEnd[1])*dx*dx
+
+    def derivatives(self, x, nder=3, integral=False):
+
+        """ [y, dy/dx, ..., d^nder y/dx^nder] at x and, if integral is true, the
+         exact integral of y from xmin to x (0 below xmin), with one section search and one solve for u per
+         value of x.
+
+         @returns (yd, intYdx), intYdx = [] if integral is false"""
+
+        assert nder >= 0 and nder <= 3,'nder must be within [0,3]'
+        intYdx = []
+
+        if isinstance(x, float) or np.ndim(x) == 0:
+            x = float(x)
+            if x < self.xmin or x > self.xmax:
+                idxEnd = 0 if x <= self.xmin else 1
+                yd = calcBezierLinearExtrapolation(x, float(self.xEnd[idxEnd]), float(self.yEnd[idxEnd]), float(self.dydxEnd[idxEnd]), nder)
+                if integral:
+                    intYdx = 0. if idxEnd == 0 else self.integralExtrapolation(x)
+            else:
+                col = self.section(x)
+                u = self.solveU(x, col)[0]
+                yd = self.sectionDerivatives(u, col, nder)
+                if integral:
+                    intYdx = self.sectionIntegral(u, col)
+            return yd, intYdx
+
+        x = np.asarray(x, dtype=float)
+        below = x < self.xmin
+        above = x > self.xmax
+        inside = ~(below | above)
+        yd = [np.zeros(x.shape) for der in range(nder+1)]
+
+        #linear extrapolation outside of [xmin, xmax]
+        for idxEnd, mask in ((0, below), (1, above)):
+            if mask.any():
+                for der, val in enumerate(calcBezierLinearExtrapolation(x[mask], self.xEnd[idxEnd], self.yEnd[idxEnd], self.dydxEnd[idxEnd], nder)):
+                    yd[der][mask] = val
+
+        if inside.any():
+            xIn = x[inside]
+            col = self.section(xIn)
+            u = self.solveU(xIn, col)[0]
+            ydIn = self.sectionDerivatives(u, col, nder)
+            for der in range(nder+1):
+                yd[der][inside] = ydIn[der]
+
+        if integral:
+            intYdx = np.zeros(x.shape)
+            if inside.any():
+                intYdx[inside] = self.sectionIntegral(u, col)
+            if above.any():
+                intYdx[above] = self.integralExtrapolation(x[above])
+        return yd, intYdx
+
+    def derivative(self, x, der):
+
+        """d^der y/dx^der at x, der within [-1,3], -1 being the integral, as
+         calcBezierYFcnXDerivative(x, curveParams, der)"""
+
+        assert der >= -1 and der <= 3,'der must be within [0,3]'
+        if der == -1:
+            return self.derivatives(x, 0, True)[1]
+        return self.derivatives(x, der)[0][der]
+
+    def __call__(self, x):
+        return self.derivatives(x, 0)[0][0]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------
+#MILLARD MODEL
+#Quintic Hermite table of a Bezier spline curve on a uniform grid of x: evaluation in
+#O(1), without solving x(u) = x, with a measured error bound
+#--------------------------------------------------------------------------------------
+import numpy as np
+from calcBezierYFcnXDerivatives import calcBezierYFcnXDerivatives, calcBezierLinearExtrapolation
+from calcBezierYFcnXParametricSample import calcBezierYFcnXParametricSample
+from createSectionIndex import curveSectionIndex
+from QuinticHermiteInterpolator import QuinticHermiteInterpolator
+
+class CurveTable:
+
+    """ A Bezier spline curve y(x) replaced, over [xmin, xmax], by the quintic
+     Hermite spline through its value and first two derivatives on a uniform
+     grid of x (QuinticHermiteInterpolator). Beyond [xmin, xmax] the curve is
+     linear and is evaluated exactly, as calcBezierYFcnXDerivative does.
+
+        table = CurveTable(createInverseBezierCurve(fiberForceVelocityCurve), 1e-9)
+        v = table(fv)                            # fv a scalar or an array
+        v, dvdfv = table.derivatives(fv, 1)[0]
+
+     The Newton iterations on u are only run once, at the grid points, when
+     the table is built. A query then costs a multiplication to find its
+     interval and a polynomial of degree 5, which is what the inverse
+     force-velocity curve of createInverseBezierCurve needs in an ODE right
+     hand side: inverting it directly is a Newton solve along the former y
+     axis at every call.
+
+     The grid is refined (its number of intervals doubled) until the error is
+     below tol. The error is measured against points of the curve computed
+     from u (calcBezierYFcnXParametricSample, no Newton iteration), 8 per
+     grid interval, spread over every section and denser where the curve
+     bends:
+
+        maxError      : largest |table(x)-y(x)| over these points
+        maxSlopeError : largest |dtable/dx(x)-dy/dx(x)| over these points
+
+     @param curveParams=(xpts,ypts,xEnd,yEnd,dydxEnd,d2ydx2End,integral)
+     @param tol   : largest error accepted on y
+     @param npts  : first number of grid intervals
+     @param nptsMax: largest number of grid intervals, the table is kept with
+                     the error it has reached if tol is not met then"""
+
+    __slots__ = ('interpolator', 'xmin', 'xmax', 'xEnd', 'yEnd', 'dydxEnd', 'npts', 'maxError', 'maxSlopeError')
+
+    def __init__(self, curveParams, tol=1e-9, npts=64, nptsMax=2**16):
+        sectionIndex = curveSectionIndex(curveParams)
+        self.xmin = float(sectionIndex[3])
+        self.xmax = float(sectionIndex[4])
+        self.xEnd = [float(val) for val in curveParams[2]]
+        self.yEnd = [float(val) for val in curveParams[3]]
+        self.dydxEnd = [float(val) for val in curveParams[4]]
+
+        while True:
+            x = np.linspace(self.xmin, self.xmax, npts+1)
+            y, dydx, d2ydx2 = calcBezierYFcnXDerivatives(x, curveParams, 2)[0]
+            self.interpolator = QuinticHermiteInterpolator(x, y, dydx, d2ydx2)
+            self.npts = npts
+
+            xCheck, yCheck, dydxCheck = calcBezierYFcnXParametricSample(curveParams, 8*npts)[:3]
+            inside = (xCheck >= self.xmin) & (xCheck <= self.xmax)
+            yTable, dydxTable = self.interpolator.evaluate(xCheck[inside], 1)
+            self.maxError = float(np.abs(yTable-yCheck[inside]).max())
+            self.maxSlopeError = float(np.abs(dydxTable-dydxCheck[inside]).max())
+            if self.maxError <= tol or 2*npts > nptsMax:
+                break
+            npts = 2*npts
+
+    def derivatives(self, x, nder=2):
+
+        """[y, dy/dx, ..., d^nder y/dx^nder] at x, nder within [0,2], as
+         BezierCurve.derivatives without the integral
+
+         @returns (yd, [])"""
+
+        assert nder >= 0 and nder <= 2,'nder must be within [0,2]'
+
+        if isinstance(x, float) or np.ndim(x) == 0:
+            x = float(x)
+            if x < self.xmin or x > self.xmax:
+                idxEnd = 0 if x < self.xmin else 1
+                return calcBezierLinearExtrapolation(x, self.xEnd[idxEnd], self.yEnd[idxEnd], self.dydxEnd[idxEnd], nder), []
+            return self.interpolator.evaluate(x, nder), []
+
+        x = np.asarray(x, dtype=float)
+        below = x < self.xmin
+        above = x > self.xmax
+        if not (below.any() or above.any()):
+            return self.interpolator.evaluate(x, nder), []
+
+        #linear extrapolation outside of [xmin, xmax]
+        inside = ~(below | above)
+        yd = [np.zeros(x.shape) for der in range(nder+1)]
+        for idxEnd, mask in ((0, below), (1, above)):
+            for der, val in enumerate(calcBezierLinearExtrapolation(x[mask], self.xEnd[idxEnd], self.yEnd[idxEnd], self.dydxEnd[idxEnd], nder)):
+                yd[der][mask] = val
+        if inside.any():
+            for der, val in enumerate(self.interpolator.evaluate(x[inside], nder)):
+                yd[der][inside] = val
+        return yd, []
+
+    def derivative(self, x, der):
+
+        """d^der y/dx^der at x, der within [0,2]"""
+
+        return self.derivatives(x, der)[0][der]
+
+    def __call__(self, x):
+        return self.derivatives(x, 0)[0][0]
@@ -21,17 +21,24 @@ from createFiberPassiveForceLengthCurve import createFiberForceLengthCurve
 from createFiberForceVelocityCurve2018 import createFiberForceVelocityCurve2018
 from createTendonForceLengthCurve import createTendonForceLengthCurve
 from createInverseBezierCurve import createInverseBezierCurve
+from cachedCurve import cachedCurve, curveCacheDir
 
 from math import log
 import numpy as np
 
 from createDefaultNormalizedMuscleCurves import ModelCurvesComparison
+from calcModelCurveErrors import calcModelCurveErrors
 
 """ Construction of all the curves: model of De Groote, of Millard and comparison
-Please choose save=True if you want to save the curves """
+Please choose save=True if you want to save the curves
+With parametric=True the Millard curves are sampled in their Bezier parameter u (no Newton iteration)
+With cache=True the Millard curves are stored in curveCacheDir (~/.cache/millardCurves) and read from there once they have been built """
 
 npts=100
 save=False
+parametric=True
+cache=True
+cacheDir=curveCacheDir if cache else None
 
 #Active force length curve
 
@@ -48,9 +55,9 @@ l0_Ma=0.2
 lf_Ma=2
 
 l_MaG=np.linspace(l0_Ma,lf_Ma,npts)
-FA=[f_a(x) for x in l_MaG]
-activeForceLengthCurve_DG=[l_MaG,f_a(l_MaG),l0_Ma,lf_Ma,min(FA),max(FA)]
-activeForceLengthCurve_M = createFiberActiveForceLengthCurve(lce0,lce1,lce2,lce3,minActiveForceLengthValue,plateauSlope,curviness,computeIntegral)
+FA=f_a(l_MaG)
+activeForceLengthCurve_DG=[l_MaG,FA,l0_Ma,lf_Ma,FA.min(),FA.max()]
+activeForceLengthCurve_M = cachedCurve(createFiberActiveForceLengthCurve,lce0,lce1,lce2,lce3,minActiveForceLengthValue,plateauSlope,curviness,computeIntegral,cacheDir=cacheDir)
 activeForceLengthParams=["Active Force Length Curve","$f_{act}(l_{MN})$","$l_{MN}$","$f_{act}$","darkred","r","salmon"]
 
 #--------------------------------------
@@ -65,7 +72,7 @@ curviness = 1.0                # in many papers this value really
 computeIntegral = 0            # is 0.1! This is huge!
 plateauSlope = 0.8616
 
-activeForceLengthCurveHack_M = createFiberActiveForceLengthCurve(lce0,lce1,lce2,lce3,minActiveForceLengthValueHack,plateauSlope,curviness,computeIntegral)
+activeForceLengthCurveHack_M = cachedCurve(createFiberActiveForceLengthCurve,lce0,lce1,lce2,lce3,minActiveForceLengthValueHack,plateauSlope,curviness,computeIntegral,cacheDir=cacheDir)
 activeForceLengthParamsHack=["Approx Active Force Length Curve","$f_{act}(l_{MN})$","$l_{MN}$","$f_{act}$","darkorange","orange","gold"]
 
 #-------------------
@@ -82,10 +89,10 @@ l0_Mp=1.0
 lf_Mp=1.65
 
 l_MpG=np.linspace(l0_Mp,lf_Mp,npts)
-FP=[f_p(x) for x in l_MpG]
+FP=f_p(l_MpG)
 passiveForceLengthCurve_DG=[l_MpG,FP,l0_Mp,lf_Mp,f_p(l0_Mp),f_p(lf_Mp)]
 
-passiveForceLengthCurve_M = createFiberForceLengthCurve(eZero,eIso,kLow, kIso,curviness,computeIntegral)
+passiveForceLengthCurve_M = cachedCurve(createFiberForceLengthCurve,eZero,eIso,kLow, kIso,curviness,computeIntegral,cacheDir=cacheDir)
 passiveForceLengthParams=["Passive Force Length Curve","$f_{pas}(l_{MN})$","$l_{MN}$","$f_{pas}$","dodgerblue","deepskyblue","c","midnightblue"]
 
 #--------------------------
@@ -108,11 +115,11 @@ v0_M=-1
 vf_M=1
 
 v_MG=np.linspace(v0_M,vf_M,npts)
-FV=[f_v(x) for x in v_MG]
-fiberForceVelocityCurve_DG=[v_MG,FV,v0_M,vf_M,min(FV),max(FV)]
+FV=f_v(v_MG)
+fiberForceVelocityCurve_DG=[v_MG,FV,v0_M,vf_M,FV.min(),FV.max()]
 
-fiberForceVelocityCurve_M=createFiberForceVelocityCurve2018(fmaxE,dydxE,dydxC,flag_smoothenNonZeroDyDxC,dydxNearE,fvAtHalfVMax,eccCurviness)
-fiberForceVelocityCurveHack_M = createFiberForceVelocityCurve2018(fmaxE,dydxNearE,dydxNearC,flag_smoothenNonZeroDyDxC,dydxNearE,fvAtHalfVMax,eccCurviness)
+fiberForceVelocityCurve_M=cachedCurve(createFiberForceVelocityCurve2018,fmaxE,dydxE,dydxC,flag_smoothenNonZeroDyDxC,dydxNearE,fvAtHalfVMax,eccCurviness,cacheDir=cacheDir)
+fiberForceVelocityCurveHack_M = cachedCurve(createFiberForceVelocityCurve2018,fmaxE,dydxNearE,dydxNearC,flag_smoothenNonZeroDyDxC,dydxNearE,fvAtHalfVMax,eccCurviness,cacheDir=cacheDir)
 fiberForceVelocityInverseCurveHack_M = createInverseBezierCurve(fiberForceVelocityCurveHack_M)
 fiberForceVelocityParams=["Force Velocity Curve","$f_v(v_{MN})$","$v_{MN}$","$f_v$","darkgreen","green","limegreen"]
 fiberForceVelocityParamsHack=["Approx Force Velocity Curve","$f_v(v_{MN})$","$v_{MN}$","$f_v$","darkolivegreen","olive","yellowgreen"]
@@ -134,18 +141,23 @@ l0_T=(1/kT)*log(c3/c1)+c2
 lf_T=1.05
 
 l_TG=np.linspace(l0_T,lf_T,npts)
-FT=[f_t(x) for x in l_TG]
-tendonForceLengthCurve_DG=[l_TG,FT,l0_T,lf_T,min(FT),max(FT)]
+FT=f_t(l_TG)
+tendonForceLengthCurve_DG=[l_TG,FT,l0_T,lf_T,FT.min(),FT.max()]
 
-tendonForceLengthCurve_M = createTendonForceLengthCurve(eIso, kIso,fToe, curviness,computeIntegral)
+tendonForceLengthCurve_M = cachedCurve(createTendonForceLengthCurve,eIso, kIso,fToe, curviness,computeIntegral,cacheDir=cacheDir)
 tendonForceLengthParams=["Tendon Force Length Curve","$f_T(l_{TN})$","$l_{TN}$","$f_T$","purple","darkviolet","violet","indigo"]
 
 curveParamVector=[activeForceLengthCurve_M,passiveForceLengthCurve_M,fiberForceVelocityCurve_M,tendonForceLengthCurve_M,activeForceLengthCurveHack_M,fiberForceVelocityCurveHack_M,fiberForceVelocityInverseCurveHack_M]
 curveSampleParams=[activeForceLengthParams,passiveForceLengthParams,fiberForceVelocityParams,tendonForceLengthParams,activeForceLengthParamsHack,fiberForceVelocityParamsHack,fiberForceVelocityInverseParamsHack]
 DeGrooteModel=[activeForceLengthCurve_DG,passiveForceLengthCurve_DG,fiberForceVelocityCurve_DG,tendonForceLengthCurve_DG]
 
+#Numerical comparison: RMS, largest and integrated absolute difference between the models
+curveErrors = calcModelCurveErrors({'active':activeForceLengthCurve_M,'passive':passiveForceLengthCurve_M,'forceVelocity':fiberForceVelocityCurve_M,'tendon':tendonForceLengthCurve_M})
+for name in curveErrors:
+    print("%-14s rms=%.4f maxAbs=%.4f area=%.4f" % (name,curveErrors[name]['rms'],curveErrors[name]['maxAbs'],curveErrors[name]['area']))
+
 #Model comparison
-ModelCurvesComparison(DeGrooteModel,curveParamVector,curveSampleParams,npts,save)
+ModelCurvesComparison(DeGrooteModel,curveParamVector,curveSampleParams,npts,save,parametric)
 
 
 
@@ -44,10 +44,7 @@ d4=0.886
 #The tendon force-length characteristic : f_t
 #f_t=lambda l_T: c1*np.exp(kT*(l_T-c2))-c3 
 def f_t(l_TN):
-    if c1*np.exp(kT*(l_TN-c2))-c3<0 :
-        return 0
-    else:
-        return c1*np.exp(kT*(l_TN-c2))-c3 
+    return np.maximum(c1*np.exp(kT*(l_TN-c2))-c3, 0)
     
 #The active force-length characteristic : f_a
 def f_a(l_MN): #with l_M normalized fiber length
@@ -58,10 +55,7 @@ def f_a(l_MN): #with l_M normalized fiber length
 
 #The passive force-length characteristic : f__p
 def f_p(l_MN):
-    if l_MN<1:
-        return 0
-    else:
-        return (np.exp((kpe*(l_MN-1))/e0)-1)/(np.exp(kpe)-1)
+    return (np.exp((kpe*np.maximum(l_MN-1, 0))/e0)-1)/(np.exp(kpe)-1)
 
 #The total of force-length characteristic : f_a+f_p
 F_MN=lambda l_MN : f_a(l_MN)+f_p(l_MN)
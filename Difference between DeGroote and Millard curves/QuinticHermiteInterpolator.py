@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------
+#MILLARD MODEL
+#Quintic Hermite spline through tabulated values, first and second derivatives, with
+#the polynomial of every interval computed once
+#--------------------------------------------------------------------------------------
+import numpy as np
+from bisect import bisect_right
+from calc5thOrderInterp import a345Minv
+
+class QuinticHermiteInterpolator:
+
+    """ Array version of calc5thOrderInterp: the quintic Hermite spline that
+     matches the function values (ysol), first derivatives (fsol) and second
+     derivatives (gsol) at the increasing points tsol.
+
+        interp = QuinticHermiteInterpolator(tsol, ysol, fsol, gsol)
+        y = interp(t)                      # t a scalar or an array
+        y, dydt = interp.evaluate(t, 1)
+
+     The six coefficients of the polynomial of every interval, in the local
+     variable u = (t-tsol[i])/(tsol[i+1]-tsol[i]), are computed in the
+     constructor, and the interval of t is found by binary search
+     (np.searchsorted for an array t, bisect on Python floats for a scalar).
+     On a uniform grid (e.g. np.linspace) it is computed directly,
+     floor((t-tsol[0])/dt), so an evaluation costs O(1) whatever the number
+     of points.
+
+     tsol, ysol, fsol and gsol can be vectors or the n x 1 columns of the
+     integral structure of the curves (createCurveIntegralStructure)."""
+
+    __slots__ = ('tsol', 'dt', 'coefs', 'tsolList', 'dtList', 'coefsList', 'invDt')
+
+    def __init__(self, tsol, ysol, fsol, gsol):
+        tsol = np.asarray(tsol, dtype=float).ravel()
+        ysol = np.asarray(ysol, dtype=float).ravel()
+        fsol = np.asarray(fsol, dtype=float).ravel()
+        gsol = np.asarray(gsol, dtype=float).ravel()
+        assert tsol.shape == ysol.shape and tsol.shape == fsol.shape and tsol.shape == gsol.shape,'Error: tsol, ysol, fsol and gsol not the same lengths - they should be'
+        assert tsol.size >= 2 and np.all(np.diff(tsol) > 0),'Error: tsol must be strictly increasing'
+
+        dt = np.diff(tsol)
+        a0 = ysol[:-1]
+        a1 = fsol[:-1]*dt
+        a2 = 0.5*gsol[:-1]*dt*dt
+        y1 = ysol[1:]
+        f1 = fsol[1:]*dt
+        g1 = gsol[1:]*dt*dt
+        a345 = a345Minv.dot(np.array([y1 - (a0+a1+a2), f1 - (a1 + 2*a2), g1 - (2*a2)]))
+
+        self.tsol = tsol
+        self.dt = dt
+        self.coefs = np.ascontiguousarray(np.vstack(([a0, a1, a2], a345)))
+        #Python floats for the scalar path
+        self.tsolList = tsol.tolist()
+        self.dtList = dt.tolist()
+        self.coefsList = self.coefs.T.tolist()
+        #1/dt on a uniform grid (up to rounding), None otherwise
+        self.invDt = None
+        if np.all(np.abs(dt-dt.mean()) <= 1e-12*dt.mean()):
+            self.invDt = (dt.size)/(tsol[-1]-tsol[0])
+
+    def interval(self, t):
+
+        """Index i of the interval [tsol[i], tsol[i+1]] containing t"""
+
+        assert np.all((t >= self.tsol[0]) & (t <= self.tsol[-1])),'Error: t not in domain of tsol'
+        if self.invDt is not None:
+            return np.minimum(((t-self.tsol[0])*self.invDt).astype(np.intp), self.dt.size-1)
+        return np.minimum(self.tsol.searchsorted(t, side='right')-1, self.dt.size-1)
+
+    def evaluate(self, t, nder=1):
+
+        """[y, dy/dt, ..., d^nder y/dt^nder] at t, nder within [0,2]"""
+
+        assert nder >= 0 and nder <= 2,'nder must be within [0,2]'
+        if isinstance(t, float) or np.ndim(t) == 0:
+            t = float(t)
+            assert t >= self.tsolList[0] and t <= self.tsolList[-1],'Error: t not in domain of tsol'
+            if self.invDt is not None:
+                idx = min(int((t-self.tsolList[0])*self.invDt), len(self.dtList)-1)
+            else:
+                idx = min(bisect_right(self.tsolList, t)-1, len(self.dtList)-1)
+            dudt = 1/self.dtList[idx]
+            u = (t-self.tsolList[idx])*dudt
+            a0, a1, a2, a3, a4, a5 = self.coefsList[idx]
+        else:
+            t = np.asarray(t, dtype=float)
+            idx = self.interval(t)
+            dudt = 1/self.dt[idx]
+            u = (t-self.tsol[idx])*dudt
+            a0, a1, a2, a3, a4, a5 = self.coefs[:, idx]
+
+        values = [a0 + u*(a1 + u*(a2 + u*(a3 + u*(a4 + u*a5))))]
+        if nder >= 1:
+            values.append((a1 + u*(2*a2 + u*(3*a3 + u*(4*a4 + u*5*a5))))*dudt)
+        if nder >= 2:
+            values.append((2*a2 + u*(6*a3 + u*(12*a4 + u*20*a5)))*dudt*dudt)
+        return values
+
+    def __call__(self, t):
+        return self.evaluate(t, 0)[0]
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------
+#MILLARD MODEL
+#On-disk cache of the curves: the control points, extrapolation coefficients and
+#integral structure of a curve are stored in a .npz file named after a hash of the
+#arguments of its constructor and of the source of the modules it uses
+#--------------------------------------------------------------------------------------
+import os
+import sys
+import inspect
+import hashlib
+import numpy as np
+
+#Change this when the tuple returned by the curve constructors changes: the
+#curves stored with another version are ignored and built again. A change of
+#the source of a constructor, or of a module of this directory that it uses
+#(createCurveIntegralStructure, calcQuinticBezierCornerControlPoints, ...),
+#changes the key of its curves by itself.
+curveCacheVersion = 2
+
+#Directory of the modules of the curves, whose sources are hashed in the keys
+curveModulesDir = os.path.dirname(os.path.abspath(__file__))
+
+#Directory of the .npz files to pass as cacheDir, in the cache directory of the
+#user (XDG_CACHE_HOME, ~/.cache by default) rather than in the source tree
+curveCacheDir = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'millardCurves')
+
+#Curves loaded or built so far, by cache key
+loadedCurves = {}
+
+def curveModules(module, modules=None):
+
+    """module and the modules of this directory it uses, directly or through
+     one another, by name: those of the functions and modules in its
+     namespace"""
+
+    if modules is None:
+        modules = {}
+    modules[module.__name__] = module
+    for value in vars(module).values():
+        name = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+        used = sys.modules.get(name) if isinstance(name, str) else None
+        if used is None or name in modules or getattr(used, '__file__', None) is None:
+            continue
+        if os.path.dirname(os.path.abspath(used.__file__)) == curveModulesDir:
+            curveModules(used, modules)
+    return modules
+
+def constructorSourceHash(createFcn):
+
+    """Hash of the sources of the module defining createFcn and of the modules
+     of this directory it uses (curveModules); the byte code of createFcn
+     stands for a source that cannot be read"""
+
+    digest = hashlib.sha1()
+    module = sys.modules.get(createFcn.__module__)
+    modules = {} if module is None else curveModules(module)
+    for name in sorted(modules):
+        try:
+            source = inspect.getsource(modules[name]).encode()
+        except (OSError, TypeError):
+            source = b''
+        digest.update(name.encode() + b'\0' + source)
+    if module is None:
+        digest.update(createFcn.__code__.co_code)
+    return digest.hexdigest()
+
+def curveCacheKey(createFcn, args):
+
+    """Name of the cache file of createFcn(*args): the name of the constructor
+     and a hash of its numerical arguments (with repr, which round-trips
+     floats exactly, so equal arguments always give the same key) and of the
+     sources it depends on, so that a curve is built again once its
+     constructor or one of its helpers has been edited"""
+
+    values = tuple(float(arg) for arg in args)
+    digest = hashlib.sha1(repr((curveCacheVersion, createFcn.__name__, constructorSourceHash(createFcn), values)).encode()).hexdigest()
+    return '%s_%s' % (createFcn.__name__, digest[:16])
+
+def readOnlyCurve(curveParams):
+
+    """curveParams with read-only arrays and tuples instead of lists, so that
+     the curve shared by all the callers of cachedCurve cannot be modified
+     in place"""
+
+    def readOnly(value):
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+            return value
+        if isinstance(value, list):
+            return tuple(value)
+        return value
+
+    integral = curveParams[6]
+    if integral != []:
+        integral = tuple(readOnly(value) for value in integral)
+    return tuple(readOnly(value) for value in curveParams[:6]) + (integral,)
+
+def saveCurve(path, curveParams):
+
+    """Writes curveParams=(xpts,ypts,xEnd,yEnd,dydxEnd,d2ydx2End,integral) to
+     the .npz file path"""
+
+    arrays = dict(zip(('xpts', 'ypts', 'xEnd', 'yEnd', 'dydxEnd', 'd2ydx2End'), curveParams[:6]))
+    if curveParams[6] != []:
+        arrays.update(zip(('xptsN', 'yptsN', 'y1ptsN', 'y2ptsN', 'xScaling'), curveParams[6]))
+    #written under a temporary name first, so an interrupted run never leaves
+    #a truncated cache file behind
+    tmpPath = path + '.tmp.npz'
+    np.savez_compressed(tmpPath, **arrays)
+    os.replace(tmpPath, path)
+
+def loadCurve(path):
+
+    """Reads back the curve tuple written by saveCurve"""
+
+    with np.load(path) as data:
+        curveParams = (data['xpts'], data['ypts'])
+        curveParams += tuple(data[name].tolist() for name in ('xEnd', 'yEnd', 'dydxEnd', 'd2ydx2End'))
+        integral = []
+        if 'xptsN' in data:
+            integral = tuple(data[name] for name in ('xptsN', 'yptsN', 'y1ptsN', 'y2ptsN')) + (float(data['xScaling']),)
+    return curveParams + (integral,)
+
+def cachedCurve(createFcn, *args, cacheDir=None):
+
+    """ createFcn(*args), read from the cache when this curve has already been
+     built, e.g.
+
+        tendonForceLengthCurve = cachedCurve(createTendonForceLengthCurve, eIso, kIso, fToe, curviness, computeIntegral)
+
+     for createFiberActiveForceLengthCurve, createFiberForceLengthCurve,
+     createFiberForceVelocityCurve2018 and createTendonForceLengthCurve, whose
+     arguments are all numbers.
+
+     The .npz file of a curve is only read the first time the curve is asked
+     for; later calls with the same arguments return the same tuple, so the
+     section index and integral table caches of the curve are kept too. Its
+     arrays are read-only and its lists are tuples: copy them to modify the
+     curve.
+
+     @param createFcn: the curve constructor
+     @param args     : its arguments
+     @param cacheDir : directory of the .npz files, created if needed, e.g.
+                       curveCacheDir. None (the default) keeps the curves in
+                       memory only: nothing is written unless a directory is
+                       given.
+
+     @return curveParams=(xpts,ypts,xEnd,yEnd,dydxEnd,d2ydx2End,integral)"""
+
+    key = curveCacheKey(createFcn, args)
+    curveParams = loadedCurves.get(key)
+    if curveParams is not None:
+        return curveParams
+
+    path = None if cacheDir is None else os.path.join(cacheDir, key + '.npz')
+    if path is not None and os.path.isfile(path):
+        curveParams = loadCurve(path)
+    else:
+        curveParams = createFcn(*args)
+        if path is not None:
+            os.makedirs(cacheDir, exist_ok=True)
+            saveCurve(path, curveParams)
+
+    curveParams = readOnlyCurve(curveParams)
+    loadedCurves[key] = curveParams
+    return curveParams
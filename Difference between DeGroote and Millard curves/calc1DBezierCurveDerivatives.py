@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------
+#MILLARD MODEL
+#Non-recursive evaluation kernel of the Bezier sections used by the Millard curves
+#--------------------------------------------------------------------------------------
+import weakref
+import numpy as np
+from math import comb, factorial
+
+#Power basis coefficient matrices of the Bezier curves and of their derivatives, by curve order
+bezierPowerMatrices = {}
+
+def bezierPowerMatrix(n):
+
+    """ Power basis coefficient matrix of an nth order Bezier curve and of all
+     its derivatives.
+
+     For control points p = (p_0 ... p_n), the jth derivative of the curve is
+     the polynomial
+
+      d^j B/du^j = sum_{k=0}^{n-j}  c_k u^k,   c = C[starts[j]:starts[j+1]] p
+
+     The rows of the jth block are the rows k >= j of the Bernstein to power
+     basis matrix, M[k,i] = (n choose k)(k choose i)(-1)^(k-i) for i <= k,
+     multiplied by k!/(k-j)!. The blocks of all the derivatives are stacked so
+     that one product gives every coefficient.
+     The matrices are computed once per order and cached.
+
+     @returns (C, starts)"""
+
+    cached = bezierPowerMatrices.get(n)
+    if cached is None:
+        M = np.zeros((n+1, n+1))
+        for k in range(n+1):
+            for i in range(k+1):
+                M[k, i] = comb(n, k)*comb(k, i)*(-1)**(k-i)
+        C = np.array([M[k]*(factorial(k)/factorial(k-j)) for j in range(n+1) for k in range(j, n+1)])
+        starts = [j*(n+1)-j*(j-1)//2 for j in range(n+2)]
+        cached = (C, starts)
+        bezierPowerMatrices[n] = cached
+    return cached
+
+#Power basis coefficients of x(u) of the curves evaluated so far, by id of their matrix of x control points
+curveXPowerCoefsCache = {}
+
+def curveXPowerCoefs(curveParams):
+
+    """Power basis coefficients of x(u) and of all its derivatives on each
+     section of the Bezier spline curveParams=(xpts,ypts,...), as passed to
+     calcBezierUFcnX, built on the first call and cached as long as xpts is
+     alive.
+
+     @returns (coefs, coefsList)
+
+            coefs    : bezierPowerMatrix(n)[0].dot(xpts), one column per section
+            coefsList: the same, one list of Python floats per section"""
+
+    xpts = curveParams[0]
+    key = id(xpts)
+    cached = curveXPowerCoefsCache.get(key)
+    if cached is None or cached[0]() is not xpts:
+        #one product per section, which rounds as the per-section products
+        #computed before the cache did
+        C = bezierPowerMatrix(xpts.shape[0]-1)[0]
+        coefsList = [C.dot(xpts[:,col]).tolist() for col in range(xpts.shape[1])]
+        coefs = np.array(coefsList).T
+        cached = (weakref.ref(xpts, lambda ref, key=key: curveXPowerCoefsCache.pop(key, None)), (coefs, coefsList))
+        curveXPowerCoefsCache[key] = cached
+    return cached[1]
+
+def calc1DBezierCurveDerivatives(u, pV, nder=0):
+
+    """ Evaluates an nth order 1D Bezier curve and its derivatives with respect
+     to u, at one or many values of u, with Horner's scheme on the power basis
+     coefficients of the curve (no recursion, no intermediate control points).
+
+     @params u   : [0,1] the argument of the Bezier curve, a scalar or an array
+     @params pV  : vector of the n+1 control points. It can also be an array
+                   (..., n+1) of control point vectors broadcast against u, to
+                   evaluate a different section at each u.
+     @params nder: highest derivative to evaluate
+
+     @returns [B, dB/du, ..., d^nder B/du^nder] evaluated at u"""
+
+    pV = np.asarray(pV, dtype=float)
+    n = pV.shape[-1]-1
+    C, starts = bezierPowerMatrix(n)
+    m = starts[min(nder, n)+1]
+    if pV.ndim == 1:
+        c = C[:m].dot(pV)
+    else:
+        c = np.moveaxis(pV @ C[:m].T, -1, 0)
+    if pV.ndim == 1 and np.ndim(u) == 0:
+        #one curve at one point: Python floats are much cheaper than numpy scalars
+        c = c.tolist()
+        u = float(u)
+    return calcBezierPowerBasisDerivatives(u, c, n, nder)
+
+def calcBezierPowerBasisDerivatives(u, c, n, nder=0):
+
+    """ Evaluates an nth order 1D Bezier curve and its derivatives with respect
+     to u from its power basis coefficients, c = C p with
+     (C, starts) = bezierPowerMatrix(n), with Horner's scheme.
+
+     @params u   : [0,1] the argument of the Bezier curve, a scalar or an array
+     @params c   : the first starts[nder+1] (or more) power basis coefficients.
+                   Either a list of Python floats, for a scalar u, or an array
+                   whose first axis is the coefficient, broadcast against u.
+     @params n   : order of the Bezier curve
+     @params nder: highest derivative to evaluate
+
+     @returns [B, dB/du, ..., d^nder B/du^nder] evaluated at u"""
+
+    starts = bezierPowerMatrix(n)[1]
+    if isinstance(c, list):
+        zero = 0.
+    else:
+        zero = 0*u  # gives every derivative the shape of u, also the constant nth one
+    values = []
+    for j in range(nder+1):
+        if j > n:
+            values.append(zero*c[0])
+            continue
+        s = starts[j]
+        val = c[s+n-j] + zero
+        for k in range(s+n-j-1, s-1, -1):
+            val = val*u + c[k]
+        values.append(val)
+    return values
@@ -8,7 +8,9 @@
 #--------------------------------------------------------------------------------------
 #Edited by christian bou chahine
 import numpy as np
-from math import floor
+
+#Inverse of the matrix giving (y1, f1, g1) from (a3, a4, a5) on [0,1]
+a345Minv = np.array([[10.0000,-4.0000,0.5000],[-15.0000,7.0000,-1.0000],[6.0000,-3.0000,0.5000]])
 
 def calc5thOrderInterp(t,tsol,ysol,fsol,gsol):
 
@@ -30,34 +32,9 @@ def calc5thOrderInterp(t,tsol,ysol,fsol,gsol):
 
     assert tsol.shape[1] == ysol.shape[1] and tsol.shape[1] == fsol.shape[1],'Error: tsol, ysol, and fsol not the same lengths - they should be'
        
-    #Get to the correct subinterval of t
-    idx = floor(rowMax/2) #where tsol(idx) <= t
-    delta = floor(rowMax/4)
-    
-    while delta > 4:
-       #if t < tsol(idx):
-       if t < tsol[idx-1][0]:
-           idx = idx - delta
-       else:
-           idx = idx + delta
-
-       delta = floor(delta/2)
-
-    
-    #if t < tsol(idx):
-    if t < tsol[idx-1][0]:
-       delta = -1
-    else:
-       delta = 1
-
-    
-    #while t >= tsol(idx) and t <= tsol(idx+1) :
-    while not (t >= tsol[idx-1][0] and t <= tsol[idx][0]) :
-        idx = idx + delta
-    
-    #Now we have the correct subinterval
-    
-    idx0 = idx
+    #Get to the correct subinterval of t: tsol(idx0) <= t <= tsol(idx1)
+    #(for many values of t, see QuinticHermiteInterpolator)
+    idx0 = min(int(tsol[:,0].searchsorted(t, side='right')), rowMax-1)
     idx1 = idx0+1
     
     dtdu = (tsol[idx1-1][0]-tsol[idx0-1][0])
@@ -74,17 +51,15 @@ def calc5thOrderInterp(t,tsol,ysol,fsol,gsol):
     a1 = f0
     a2 = 0.5*g0
     
-    a345Minv = np.array([[10.0000,-4.0000,0.5000],[-15.0000,7.0000,-1.0000],[6.0000,-3.0000,0.5000]])
     a345RHS = np.array([y1 - (a0+a1+a2),f1 - (a1 + 2*a2),g1 - (2*a2)])
                
-    a345 = a345Minv*a345RHS
-    a345 =np.dot(a345Minv,a345RHS)
+    a345 = np.dot(a345Minv,a345RHS)
 
     a3 = a345[0]
     a4 = a345[1]
     a5 = a345[2]
     
-    u1 = (t-tsol[idx0-1]) * dudt
+    u1 = (t-tsol[idx0-1][0]) * dudt
     u2 = u1*u1
     u3 = u2*u1
     u4 = u3*u1
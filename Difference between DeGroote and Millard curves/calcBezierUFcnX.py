@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------
+#MILLARD MODEL
+#Inversion of the x(u) Bezier sections: safeguarded Newton iteration on u
+#--------------------------------------------------------------------------------------
+import numpy as np
+from calc1DBezierCurveDerivatives import calcBezierPowerBasisDerivatives
+
+def calcBezierUFcnX(x, c, n, u0=None, tol=2.2204e-15, uTol=1e-10, iterMax=60):
+
+    """ Solves x(u) = x for u in [0,1] on a Bezier section x(u) that is
+     monotonic in u, with a Newton-bisection hybrid (rtsafe):
+
+     - the root stays bracketed in [a,b], starting from [0,1], and the bracket
+       is updated with the sign of x(u)-x at every iterate
+     - a Newton step, clipped to the bracket, is taken when it is at most half
+       of the step before the previous one, otherwise the bracket is bisected
+
+     There is nothing random: the same x always gives the same u. The bracket
+     at least halves every two iterations once Newton stalls, so the loop ends
+     within iterMax iterations, and Newton converges quadratically near the
+     root (2 to 3 iterations from a close first guess).
+
+     @params x      : the value of x to invert, a scalar (c a list) or an array
+     @params c      : the power basis coefficients of x(u) and of its first
+                      derivative (bezierPowerMatrix(n) times the control
+                      points). A list of Python floats for a scalar x, or an
+                      array whose first axis is the coefficient, one column
+                      per value of x.
+     @params n      : order of the Bezier section
+     @params u0     : first guess of u, e.g. the u of the previous query of a
+                      time stepping loop. By default u is interpolated
+                      linearly between the ends of the section.
+     @params tol    : tolerance on |x(u)-x|
+     @params uTol   : a Newton step on u smaller than uTol ends the iteration
+                      without evaluating x(u) again
+     @params iterMax: largest number of iterations
+
+     @returns (u, iterations): u, and the number of evaluations of x(u)
+                               (an array for an array x)"""
+
+    #x(0) and x(1) are the ends of the section
+    x0 = c[0]
+    x1 = sum(c[k] for k in range(n+1))
+
+    if isinstance(c, list):
+        increasing = x1 >= x0
+        if u0 is None:
+            u = (x-x0)/(x1-x0) if x1 != x0 else 0.5
+        else:
+            u = u0
+        u = min(max(u, 0.), 1.)
+        a, b = 0., 1.
+        step = stepOld = 1.
+        iterations = 0
+        while iterations < iterMax:
+            xu, dxdu = calcBezierPowerBasisDerivatives(u, c, n, 1)
+            iterations += 1
+            err = xu - x
+            if abs(err) <= tol:
+                break
+            if (err > 0) == increasing:
+                b = u
+            else:
+                a = u
+
+            stepOlder, stepOld = stepOld, step
+            if dxdu != 0:
+                uNew = min(max(u - err/dxdu, a), b)
+            if dxdu == 0 or abs(uNew-u) > 0.5*abs(stepOlder):
+                uNew = 0.5*(a+b)
+            elif abs(uNew-u) <= uTol:
+                #the error left after a Newton step this small is far below tol
+                u = uNew
+                break
+            step = uNew-u
+            if step == 0:
+                break
+            u = uNew
+        return u, iterations
+
+    x = np.asarray(x, dtype=float)
+    increasing = x1 >= x0
+    if u0 is None:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            u = np.where(x1 != x0, (x-x0)/(x1-x0), 0.5)
+    else:
+        u = np.array(np.broadcast_to(u0, x.shape), dtype=float)
+    u = np.clip(u, 0., 1.)
+    a = np.zeros(x.shape)
+    b = np.ones(x.shape)
+    step = np.ones(x.shape)
+    stepOld = np.ones(x.shape)
+    iterations = np.zeros(x.shape, dtype=int)
+    active = np.ones(x.shape, dtype=bool)
+
+    for k in range(iterMax):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+        ui = u[idx]
+        xu, dxdu = calcBezierPowerBasisDerivatives(ui, c[:, idx], n, 1)
+        iterations[idx] += 1
+        err = xu - x[idx]
+        done = np.abs(err) <= tol
+
+        above = (err > 0) == increasing[idx]
+        ai = np.where(above, a[idx], ui)
+        bi = np.where(above, ui, b[idx])
+        a[idx] = ai
+        b[idx] = bi
+
+        stepOlder = stepOld[idx]
+        stepOld[idx] = step[idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            uNew = np.clip(ui - err/dxdu, ai, bi)
+        bisect = (dxdu == 0) | ~(np.abs(uNew-ui) <= 0.5*np.abs(stepOlder))
+        converged = ~done & ~bisect & (np.abs(uNew-ui) <= uTol)
+        uNew = np.where(bisect, 0.5*(ai+bi), uNew)
+        stepNew = uNew-ui
+        done |= (stepNew == 0) | converged
+        ui = np.where(converged, uNew, ui)
+
+        step[idx] = stepNew
+        u[idx] = np.where(done, ui, uNew)
+        active[idx] = ~done
+
+    return u, iterations
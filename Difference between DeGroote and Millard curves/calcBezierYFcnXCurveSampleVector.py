@@ -7,11 +7,12 @@
     #https://github.com/mjhmilla/Millard2012EquilibriumMuscleMatlabPort/blob/master/src/calcBezierYFcnXCurveSampleVector.m
 #--------------------------------------------------------------------------------------
 #Edited by christian bou chahine
-from calcBezierYFcnXDerivative import calcBezierYFcnXDerivative
+from calcBezierYFcnXDerivatives import calcBezierYFcnXDerivatives
+from calcBezierYFcnXParametricSample import calcBezierYFcnXParametricSample
 from ComplementaryFonc import minmin,maxmax
 import numpy as np
 
-def calcBezierYFcnXCurveSampleVector(curveParams, npts):
+def calcBezierYFcnXCurveSampleVector(curveParams, npts, parametric=False):
     
     """This function evaluates a Bezier spline curve (x(u), y(u)) across its
      entire domain, and and slightly beyond to get values in the extrapolated
@@ -45,8 +46,15 @@ def calcBezierYFcnXCurveSampleVector(curveParams, npts):
                       .y2ptsN: '' integral's 2nd derivative.
 
      @param npts: the number of samples to use across the curve domain             
+     @param parametric: if True, the curve is sampled on a grid of u in every
+                        Bezier section instead of a uniform grid of x
+                        (calcBezierYFcnXParametricSample): no Newton
+                        iteration, for plots
      @return curveValues, a struct with the fields"""
 
+    if parametric:
+        return calcBezierYFcnXParametricSample(curveParams, npts)
+
     xmin  = minmin(curveParams[0])
     xmax  = maxmax(curveParams[0])
     delta = xmax-xmin
@@ -61,22 +69,8 @@ def calcBezierYFcnXCurveSampleVector(curveParams, npts):
     
     x=np.array([(xmin+(i*(xmax-xmin))/npts) for i in range(npts+1)])
     
-    y=np.zeros(shape=x.shape)
-    dydx = np.zeros(shape=x.shape)
-    d2ydx2 = np.zeros(shape=x.shape)
-    d3ydx3 = np.zeros(shape=x.shape)
-    intYdx = []
-    if curveParams[6] != []:
-        intYdx = np.zeros(shape=x.shape)
-
-    for k in range(x.shape[0]):
-        if curveParams[6] != []:
-            intYdx[k] = calcBezierYFcnXDerivative(x[k], curveParams, -1)
- 
-        y[k]=calcBezierYFcnXDerivative(x[k], curveParams, 0) 
-        dydx[k]   = calcBezierYFcnXDerivative(x[k], curveParams, 1)
-        d2ydx2[k] = calcBezierYFcnXDerivative(x[k], curveParams, 2)
-        d3ydx3[k] = calcBezierYFcnXDerivative(x[k], curveParams, 3)
+    #value, derivatives and integral from one solve for u per sample
+    (y,dydx,d2ydx2,d3ydx3),intYdx = calcBezierYFcnXDerivatives(x, curveParams, 3, curveParams[6] != [])
 
 
     #create curveValues
@@ -7,12 +7,12 @@
     #https://github.com/mjhmilla/Millard2012EquilibriumMuscleMatlabPort/blob/master/src/calcBezierYFcnXDerivative.m
 #--------------------------------------------------------------------------------------
 #Edited by christian bou chahine
-import numpy as np
-from numpy import random
 from calcIndex import calcIndex
-from calc1DBezierCurveValue import calc1DBezierCurveValue
-from calc5thOrderInterp import calc5thOrderInterp
-from ComplementaryFonc import minmin, maxmax
+from createSectionIndex import curveSectionIndex
+from calc1DBezierCurveDerivatives import calc1DBezierCurveDerivatives, curveXPowerCoefs
+from calcBezierUFcnX import calcBezierUFcnX
+from createBezierIntegralTable import curveIntegralTable, calcBezierIntegralPolynomial, calcIntegralExtrapolation
+from calcBezierYFcnXDerivatives import calcBezierYFcnXChainRule, calcBezierLinearExtrapolation
 
 def calcBezierYFcnXDerivative(x, curveParams, der):
 
@@ -72,8 +72,10 @@ def calcBezierYFcnXDerivative(x, curveParams, der):
     #col = size(xpts,2)
     nrow = curveParams[0].shape[0]
     #ncol = curveParams[0].shape[1]
-    xmin = minmin(curveParams[0])
-    xmax = maxmax(curveParams[0])
+    #section breakpoints and x range, built once per curve
+    sectionIndex = curveSectionIndex(curveParams)
+    xmin = sectionIndex[3]
+    xmax = sectionIndex[4]
     
     if x < xmin or x > xmax:
         if x <= xmin:
@@ -84,139 +86,50 @@ def calcBezierYFcnXDerivative(x, curveParams, der):
         #evaluate the desired derivative of y at x
 
         if der==-1:
-            assert curveParams[6]!=[],'Integral function has not been computed for this curve'
             
             if x <= xmin:
                 val = 0
             else:
-
-                y0  = curveParams[6][1][len(np.array(curveParams[6][0]))-1][0]
-                f1  = curveParams[6][1][len(np.array(curveParams[6][0]))-1][0]
-                f2  = curveParams[6][1][len(np.array(curveParams[6][0]))-1][0]
-                x0  = curveParams[6][1][len(np.array(curveParams[6][0]))-1][0]
-                   
-                val = y0 + f1*(x-x0) + (0.5*f2)*(x-x0)**2
+                #the curve is linear beyond xmax, its integral quadratic
+                val = calcIntegralExtrapolation(x, curveParams)
        
-        elif der==0:
-            x0   = curveParams[2][idxEnd] 
+        else:
+            x0   = curveParams[2][idxEnd]
             y0   = curveParams[3][idxEnd]
             dydx = curveParams[4][idxEnd]
-                            
-            val = dydx*(x-x0) + y0
-                 
-        elif der==1:
-            dydx = curveParams[4][idxEnd]
-            val  = dydx
-            
-        else:
-            val = 0 
-      
+
+            val = calcBezierLinearExtrapolation(x, x0, y0, dydx, der)[der]
+
     else:
         #Find the spline section that x is in 
         moduloRange = [] 
         eps=2.2204e-16
         tol= eps        
         #options=[moduloRange,tol]
-        xInterval= np.array([curveParams[0][0,:],curveParams[0][nrow-1,:]])
-        col=calcIndex(x,xInterval,moduloRange,tol)
+        col=calcIndex(x,sectionIndex,moduloRange,tol)
                                    
-        #Extract the vector of control points, and calculate
-        #the control points that define the derivative curve
+        #Extract the vector of control points
 
         xV  = curveParams[0][:,col]       
-        x1V = np.diff(xV) *(nrow-1)
         
         #Find the value of u that corresponds to the desired value of x
 
-        u = (x-curveParams[0][0,col]) / (curveParams[0][nrow-1, col]-curveParams[0][0,col])
-        iter= 1
-        iterMax = 100
-        tol = eps*10
-        err = tol*10
-        
-        while iter < iterMax and abs(err) > tol:
-           err = calc1DBezierCurveValue(u, xV) - x
-           derr = calc1DBezierCurveValue(u, x1V)
-           
-           if abs(err) > tol and abs(derr) > eps :  
-               du = -err/derr
-               u  = u + du
-              
-               #For very nonlinear curves Newton's method can
-               #become pathological. If u is outside [0,1] we
-               #kick it back into the interval by some random small amount.
-               
-               if u < 0 or u > 1.0:
-                    if u < 0:
-                       u = 0 
-                       u = u + random.uniform(0,1,(1,1))*0.1 
-                    else:
-                       u = 1 
-                       u = u - random.uniform(0,1,(1,1))*0.1 
-         
-           iter = iter+1
+        u, iterations = calcBezierUFcnX(x, curveXPowerCoefs(curveParams)[1][col], nrow-1)
             
         #Evaluate the desired derivative of y   
 
         if der==-1:
-            assert curveParams[6]!=[],'Integral function has not been computed for this curve'
                
-            y0 = calc5thOrderInterp(x,np.array(curveParams[6][0]),np.array(curveParams[6][1]),np.array(curveParams[6][2]),np.array(curveParams[6][3]))
-            val = y0 
+            #exact integral: polynomial in u on the section, plus the
+            #integral of the previous sections
+            coefs, prefix = curveIntegralTable(curveParams)[:2]
+            val = prefix[col] + calcBezierIntegralPolynomial(u, coefs[:,col].tolist())
                   
-        elif der==0:
-            yV  = curveParams[1][col,:]
-            val = calc1DBezierCurveValue(u, yV)
-        elif der==1:
+        else:
+            #derivatives of x(u) and y(u) up to der, evaluated in one pass,
+            #and the chain rule
             yV  = curveParams[1][col,:]
-            y1V =  np.diff(yV) *(nrow-1)
-            x1  = calc1DBezierCurveValue(u, x1V)
-            y1  = calc1DBezierCurveValue(u, y1V) 
-            val = y1/x1
-            
-        elif der==2:
-            x2V =  np.diff(x1V)*(nrow-2) 
-                
-            yV  =  curveParams[1][col,:]
-            y1V =  np.diff(yV) *(nrow-1) 
-            y2V =  np.diff(y1V)*(nrow-2) 
-        
-            x1  = calc1DBezierCurveValue(u, x1V)
-            y1  = calc1DBezierCurveValue(u, y1V)
-            x2  = calc1DBezierCurveValue(u, x2V)
-            y2  = calc1DBezierCurveValue(u, y2V)
-                
-            t1 = 1/x1
-            t3 = x1*x1
-                
-            val = (y2 * t1 - y1 / t3 * x2) * t1
-            
-        else: 
-
-            x2V = np.diff(x1V)*(nrow-2) 
-            x3V = np.diff(x2V)*(nrow-3) 
-                
-            yV  =  curveParams[1][col,:] 
-            y1V =  np.diff(yV) *(nrow-1) 
-            y2V =  np.diff(y1V)*(nrow-2) 
-            y3V =  np.diff(y2V)*(nrow-3) 
-                
-            x1  = calc1DBezierCurveValue(u, x1V)
-            y1  = calc1DBezierCurveValue(u, y1V)
-                
-            x2  = calc1DBezierCurveValue(u, x2V)
-            y2  = calc1DBezierCurveValue(u, y2V)
-                
-            x3  = calc1DBezierCurveValue(u, x3V)
-            y3  = calc1DBezierCurveValue(u, y3V)
-            
-            t1 = 1 / x1
-            t3 = x1*x1
-            t4 = 1 / t3
-            t11 = x2*x2
-            t14 = y1 * t4
-                
-            val = ((y3*t1 - 2*y2*t4*x2+ 2*y1/t3/x1 * t11 - t14 * x3) * t1-(y2*t1 - t14*x2)*t4*x2) * t1      
+            val = calcBezierYFcnXChainRule(u, xV, yV, der)[der]
 
     return val
 
@@ -274,8 +187,9 @@ def calcBezierYFcnXDerivative2(x, curveParams):
     
 
     nrow = curveParams[0].shape[0]
-    xmin = minmin(curveParams[0])
-    xmax = maxmax(curveParams[0])
+    sectionIndex = curveSectionIndex(curveParams)
+    xmin = sectionIndex[3]
+    xmax = sectionIndex[4]
     
     if x < xmin or x > xmax:
         if x <= xmin:
@@ -298,48 +212,15 @@ def calcBezierYFcnXDerivative2(x, curveParams):
         eps=2.2204e-16
         tol= eps        
         #options=[moduloRange,tol]
-        xInterval= np.array([curveParams[0][0,:],curveParams[0][nrow-1,:]])
-        col=calcIndex(x,xInterval,moduloRange,tol)
+        col=calcIndex(x,sectionIndex,moduloRange,tol)
                                    
-        #Extract the vector of control points, and calculate
-        #the control points that define the derivative curve
-
-        xV  = curveParams[0][:,col]       
-        x1V = np.diff(xV) *(nrow-1)
-        
         #Find the value of u that corresponds to the desired value of x
 
-        u = (x-curveParams[0][0,col]) / (curveParams[0][nrow-1, col]-curveParams[0][0,col])
-        iter= 1
-        iterMax = 100
-        tol = eps*10
-        err = tol*10
-        
-        while iter < iterMax and abs(err) > tol:
-           err = calc1DBezierCurveValue(u, xV) - x
-           derr = calc1DBezierCurveValue(u, x1V)
-           
-           if abs(err) > tol and abs(derr) > eps :  
-               du = -err/derr
-               u  = u + du
-              
-               #For very nonlinear curves Newton's method can
-               #become pathological. If u is outside [0,1] we
-               #kick it back into the interval by some random small amount.
-               
-               if u < 0 or u > 1.0:
-                    if u < 0:
-                       u = 0 
-                       u = u + random.uniform(0,1,(1,1))*0.1 
-                    else:
-                       u = 1 
-                       u = u - random.uniform(0,1,(1,1))*0.1 
-         
-           iter = iter+1
+        u, iterations = calcBezierUFcnX(x, curveXPowerCoefs(curveParams)[1][col], nrow-1)
             
         #Evaluate the desired derivative of y   
         yV  = curveParams[1][col,:]
-        val = calc1DBezierCurveValue(u, yV)
+        val = calc1DBezierCurveDerivatives(u, yV)[0]
 
     return val
 
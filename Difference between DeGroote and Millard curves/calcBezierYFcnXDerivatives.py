@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------
+#MILLARD MODEL
+#One-pass evaluation of a Bezier spline curve y(x): value, derivatives and integral
+#at one or many values of x, with a single solve for u per value of x
+#--------------------------------------------------------------------------------------
+import numpy as np
+from calcIndex import calcIndex
+from createSectionIndex import curveSectionIndex
+from calc1DBezierCurveDerivatives import calc1DBezierCurveDerivatives, curveXPowerCoefs
+from calcBezierUFcnX import calcBezierUFcnX
+from createBezierIntegralTable import curveIntegralTable, calcBezierIntegralPolynomial, calcIntegralExtrapolation
+
+def calcBezierYFcnXDerivatives(x, curveParams, nder=3, integral=False):
+
+    """ Same curve as calcBezierYFcnXDerivative, but all the derivatives up to
+     nder (and the integral if asked) are returned together, and x can be an
+     array. The section search and the Newton solve for u are done once per
+     value of x, for all the requested outputs, and on all the values of x
+     at the same time.
+
+     @param x: value, or array of values, to evaluate the curve at
+
+     @param curveParams=(xpts,ypts,xEnd,yEnd,dydxEnd,d2ydx2E,integral)
+                        as in calcBezierYFcnXDerivative
+
+     @param nder: highest derivative of y to evaluate, within [0,3]
+
+     @param integral: if true, the integral of the curve from xmin (0 below
+                      xmin) is also evaluated, exactly, from the polynomials
+                      of createBezierIntegralTable
+
+     @returns (yd, intYdx)
+
+            yd    : [y, dy/dx, ..., d^nder y/dx^nder] evaluated at x
+            intYdx: the integral of y evaluated at x, [] if integral is false"""
+
+    assert nder >= 0 and nder <= 3,'nder must be within [0,3]'
+
+    if np.ndim(x) == 0:
+        return calcBezierYFcnXDerivativesScalar(float(x), curveParams, nder, integral)
+
+    x = np.asarray(x, dtype=float)
+    xpts = curveParams[0]
+    ypts = curveParams[1]
+    nrow = xpts.shape[0]
+
+    sectionIndex = curveSectionIndex(curveParams)
+    xmin = sectionIndex[3]
+    xmax = sectionIndex[4]
+
+    below = x < xmin
+    above = x > xmax
+    inside = ~(below | above)
+
+    yd = [np.zeros(x.shape) for der in range(nder+1)]
+    intYdx = np.zeros(x.shape) if integral else []
+
+    #linear extrapolation outside of [xmin, xmax]
+    for idxEnd, mask in ((0, below), (1, above)):
+        if not mask.any():
+            continue
+        x0   = curveParams[2][idxEnd]
+        y0   = curveParams[3][idxEnd]
+        dydx = curveParams[4][idxEnd]
+        for der, val in enumerate(calcBezierLinearExtrapolation(x[mask], x0, y0, dydx, nder)):
+            yd[der][mask] = val
+
+    if inside.any():
+        xIn = x[inside]
+
+        #Find the spline section of each x and its control points
+        moduloRange = []
+        eps=2.2204e-16
+        tol= eps
+        col = calcIndex(xIn,sectionIndex,moduloRange,tol)
+        xV = xpts[:,col].T
+        yV = ypts[col,:]
+
+        #Find the values of u that correspond to x, all the points at once
+        u, iterations = calcBezierUFcnX(xIn, curveXPowerCoefs(curveParams)[0][:,col], nrow-1)
+
+        ydIn = calcBezierYFcnXChainRule(u, xV, yV, nder)
+        for der in range(nder+1):
+            yd[der][inside] = ydIn[der]
+
+        if integral:
+            coefs, prefix = curveIntegralTable(curveParams)[:2]
+            intYdx[inside] = prefix[col] + calcBezierIntegralPolynomial(u, coefs[:,col])
+
+    if integral and above.any():
+        intYdx[above] = calcIntegralExtrapolation(x[above], curveParams)
+
+    return yd, intYdx
+
+def calcBezierYFcnXDerivativesScalar(x, curveParams, nder, integral):
+
+    """calcBezierYFcnXDerivatives for a scalar x, on Python floats"""
+
+    xpts = curveParams[0]
+    nrow = xpts.shape[0]
+    sectionIndex = curveSectionIndex(curveParams)
+    xmin = sectionIndex[3]
+    xmax = sectionIndex[4]
+    intYdx = []
+
+    if x < xmin or x > xmax:
+        if x <= xmin:
+           idxEnd = 0
+        else:
+           idxEnd = 1
+
+        #linear extrapolation outside of [xmin, xmax]
+        x0   = curveParams[2][idxEnd]
+        y0   = curveParams[3][idxEnd]
+        dydx = curveParams[4][idxEnd]
+        yd = [float(val) for val in calcBezierLinearExtrapolation(x, x0, y0, dydx, nder)]
+
+        if integral:
+            intYdx = 0. if idxEnd == 0 else float(calcIntegralExtrapolation(x, curveParams))
+
+    else:
+        #Find the spline section that x is in
+        moduloRange = []
+        eps=2.2204e-16
+        tol= eps
+        col=calcIndex(x,sectionIndex,moduloRange,tol)
+        xV = xpts[:,col]
+        yV = curveParams[1][col,:]
+
+        #Find the value of u that corresponds to the desired value of x
+        u, iterations = calcBezierUFcnX(x, curveXPowerCoefs(curveParams)[1][col], nrow-1)
+
+        yd = calcBezierYFcnXChainRule(u, xV, yV, nder)
+
+        if integral:
+            coefs, prefix = curveIntegralTable(curveParams)[:2]
+            intYdx = float(prefix[col]) + calcBezierIntegralPolynomial(u, coefs[:,col].tolist())
+
+    return yd, intYdx
+
+def calcBezierYFcnXChainRule(u, xV, yV, nder):
+
+    """Derivatives of y with respect to x, up to nder, at u from those of
+     the Bezier curves x(u) and y(u)"""
+
+    ydu = calc1DBezierCurveDerivatives(u, yV, nder)
+    xdu = calc1DBezierCurveDerivatives(u, xV, nder) if nder >= 1 else None
+    return calcBezierChainRule(xdu, ydu, nder)
+
+def calcBezierChainRule(xdu, ydu, nder):
+
+    """[y, dy/dx, ..., d^nder y/dx^nder] from [x, dx/du, ...] and
+     [y, dy/du, ...], the derivatives of x(u) and y(u) up to nder (xdu is
+     not used if nder is 0)"""
+
+    yd = [ydu[0]]
+    if nder >= 1:
+        x1 = xdu[1]
+        y1 = ydu[1]
+        t1 = 1/x1
+        yd.append(y1*t1)
+    if nder >= 2:
+        x2 = xdu[2]
+        y2 = ydu[2]
+        t3 = x1*x1
+        yd.append((y2 * t1 - y1 / t3 * x2) * t1)
+    if nder >= 3:
+        x3 = xdu[3]
+        y3 = ydu[3]
+        t4 = 1 / t3
+        t11 = x2*x2
+        t14 = y1 * t4
+        yd.append(((y3*t1 - 2*y2*t4*x2+ 2*y1/t3/x1 * t11 - t14 * x3) * t1-(y2*t1 - t14*x2)*t4*x2) * t1)
+    return yd
+
+def calcBezierLinearExtrapolation(x, x0, y0, dydx, nder):
+
+    """[y, dy/dx, ..., d^nder y/dx^nder] of the line through (x0, y0) of
+     slope dydx, the curve beyond its end points, at x (a scalar or an array)"""
+
+    zero = 0. if isinstance(x, float) or np.ndim(x) == 0 else np.zeros(np.shape(x))
+    return [dydx*(x-x0) + y0, dydx+zero, zero, zero][:nder+1]
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------
+#MILLARD MODEL
+#Sampling of a Bezier spline curve on a grid of its parameter u, without inverting x(u)
+#--------------------------------------------------------------------------------------
+import numpy as np
+from math import ceil
+from createSectionIndex import curveSectionIndex
+from calc1DBezierCurveDerivatives import calc1DBezierCurveDerivatives
+from calcBezierYFcnXDerivatives import calcBezierYFcnXChainRule
+from createBezierIntegralTable import curveIntegralTable, calcBezierIntegralPolynomial, calcIntegralExtrapolation
+
+def calcBezierYFcnXParametricSample(curveParams, npts):
+
+    """Parametric counterpart of calcBezierYFcnXCurveSampleVector: the curve
+     is sampled on a uniform grid of u in every Bezier section, where x(u),
+     y(u) and their derivatives are evaluated directly, so no Newton
+     iteration is run, and the integral is the exact polynomial of
+     createBezierIntegralTable. The samples are not uniformly spaced in x: they are
+     denser where the curve bends.
+
+     The domain is extended by a fifth of its width on both sides, as in
+     calcBezierYFcnXCurveSampleVector, where the curve is extrapolated
+     linearly.
+
+     @param curveParams=(xpts,ypts,xEnd,yEnd,dydxEnd,d2ydx2E,integral)
+
+     @param npts: the approximate number of samples across the curve domain,
+                  spread evenly over the sections; each extrapolated tail
+                  gets a tenth of it (at least 2 samples)
+
+     @return curveValues=(x,y,dydx,d2ydx2,d3ydx3,intYdx), sorted by x, with
+             intYdx = [] if the integral of the curve has not been computed"""
+
+    xpts = curveParams[0]
+    ypts = curveParams[1]
+    nsections = xpts.shape[1]
+    sectionIndex = curveSectionIndex(curveParams)
+    xmin = sectionIndex[3]
+    xmax = sectionIndex[4]
+    delta = xmax-xmin
+
+    #u grid of every section; the first point of a section is the last one
+    #of the previous section, so it is only kept for the first section
+    nu = max(ceil(npts/nsections), 2)
+    uGrid = np.linspace(0, 1, nu+1)
+    u = np.concatenate([uGrid]+[uGrid[1:]]*(nsections-1))
+    col = np.repeat(np.arange(nsections), nu)
+    col = np.concatenate(([0], col))
+    xV = xpts[:,col].T
+    yV = ypts[col,:]
+
+    xIn = calc1DBezierCurveDerivatives(u, xV)[0]
+    ydIn = calcBezierYFcnXChainRule(u, xV, yV, 3)
+
+    #linear extrapolation tails, on both sides of [xmin, xmax]
+    ntail = max(npts//10, 2)
+    xBelow = np.linspace(xmin-delta/5, xmin, ntail, endpoint=False)
+    xAbove = np.linspace(xmax, xmax+delta/5, ntail+1)[1:]
+    tails = []
+    for idxEnd, xTail in ((0, xBelow), (1, xAbove)):
+        x0   = curveParams[2][idxEnd]
+        y0   = curveParams[3][idxEnd]
+        dydx = curveParams[4][idxEnd]
+        tails.append([xTail, dydx*(xTail-x0) + y0, np.full(xTail.shape, dydx), np.zeros(xTail.shape), np.zeros(xTail.shape)])
+
+    x, y, dydx, d2ydx2, d3ydx3 = (np.concatenate((below, inside, above)) for below, inside, above in zip(tails[0], [xIn]+ydIn, tails[1]))
+
+    intYdx = []
+    if curveParams[6] != []:
+        coefs, prefix = curveIntegralTable(curveParams)[:2]
+        intIn = prefix[col] + calcBezierIntegralPolynomial(u, coefs[:,col])
+        intYdx = np.concatenate((np.zeros(xBelow.shape), intIn, calcIntegralExtrapolation(xAbove, curveParams)))
+
+    order = np.argsort(x, kind='stable')
+    curveValues = tuple(val[order] for val in (x, y, dydx, d2ydx2, d3ydx3))
+    curveValues = curveValues+(intYdx[order] if curveParams[6] != [] else [],)
+
+    return curveValues
@@ -8,6 +8,9 @@
 #--------------------------------------------------------------------------------------
 #Edited by christian bou chahine
 
+import numpy as np
+from createSectionIndex import createSectionIndex
+
 def calcIndex(x, ptsM,moduloRange,tol): #options=[moduloRange,tol]
  
     """Given a series of sequential ranges in the 2xRealN matrixReal
@@ -17,7 +20,7 @@ def calcIndex(x, ptsM,moduloRange,tol): #options=[moduloRange,tol]
     % the function will return the indexReal such that xReal is at the 
     % start of hte interval.
     %
-    % @param xReal: a double 
+    % @param xReal: a double, or an array of doubles
     % @param ptsM: a 2 xReal n matrixReal that defines the range of n
     %              sub intervals. For exRealample
     %
@@ -28,43 +31,48 @@ def calcIndex(x, ptsM,moduloRange,tol): #options=[moduloRange,tol]
     %        defines 5 adjacent sub intervals 
     %        [[0,1],[1,2],[2,3],[3,4],[4,5]]
     %
+    %              ptsM can also be the section index returned by
+    %              createSectionIndex(ptsM), built once per curve.
+    %
     % @param tol: how close a value xReal is allowed to be to a
     %             sub interval border before it is declared to be
     %             on the border.
     %
     % @returns idx: the column indexReal of ptsM that contains an
-    %               interval that includes xReal."""
+    %               interval that includes xReal (an array of indices
+    %               for an array xReal).
+    %
+    % The sub intervals are sorted, so the search is a bisection
+    % (np.searchsorted) on their starts: its cost does not grow with the
+    % number of sub intervals. As in the original linear scan, the last
+    % matching interval wins, so a point on (or within tol of) a border
+    % belongs to the interval that starts there."""
     
+    if isinstance(ptsM, tuple):
+        starts, ends, dxSign = ptsM[0], ptsM[1], ptsM[2]
+    else:
+        starts, ends, dxSign = createSectionIndex(ptsM)[:3]
 
-    xReal = x.real
-    idx = 0
-    flag_found = 0
-    
-    rows = ptsM.shape[0]   
-    
-    #xReal is either monotonically increasing or decreasing
-    dxSign = 1
-    
-    if ptsM[1,0]-ptsM[0,0] < 0:
-        dxSign = -1
-    
-    for i in range(ptsM.shape[1]):
-        
-        if dxSign == 1:
-            if (xReal >= ptsM[0,i] and xReal < ptsM[rows-1,i]) or (abs(xReal-ptsM[0,i]) < tol or abs(xReal-ptsM[rows-1,i]) < tol) :
-                idx = i
-                flag_found = 1
+    xReal = dxSign*np.real(x)
 
-        else: 
-            if (xReal <= ptsM[0,i] and xReal > ptsM[rows-1,i]) or (abs(xReal-ptsM[0,i]) < tol or abs(xReal-ptsM[rows-1,i]) < tol ):
-                idx = i
-                flag_found = 1
+    #last interval whose start is at most xReal or within tol of it. xReal+tol
+    #is rounded, so the start found is dropped if it is tol or more above
+    #xReal. As in the linear scan, the end point of the curve is accepted even
+    #with tol = 0
+    last = ends.shape[0]-1
 
-    #Check if the value xReal is identically the last point
-    if flag_found == 0 and xReal == ptsM[rows-1,ptsM.shape[1]-1]: 
-        idx = ptsM.shape[1]-1
-        flag_found = 1
-    
-    assert flag_found == 1,'Error: A value of xReal was used that is not within the Bezier curve set.'
+    if np.ndim(xReal) == 0:
+        idx = int(starts.searchsorted(xReal+tol, side='right'))-1
+        if idx >= 0 and starts[idx] > xReal and not abs(xReal-starts[idx]) < tol:
+            idx = idx-1
+        flag_found = idx >= 0 and (xReal < ends[idx] or abs(xReal-ends[idx]) < tol or (idx == last and xReal == ends[last]))
+    else:
+        idx = starts.searchsorted(xReal+tol, side='right')-1
+        idxValid = np.maximum(idx, 0)
+        idx = np.where((idx >= 0) & (starts[idxValid] > xReal) & ~(np.abs(xReal-starts[idxValid]) < tol), idx-1, idx)
+        idxValid = np.maximum(idx, 0)
+        flag_found = np.all((idx >= 0) & ((xReal < ends[idxValid]) | (np.abs(xReal-ends[idxValid]) < tol) | ((idx == last) & (xReal == ends[last]))))
+
+    assert flag_found,'Error: A value of xReal was used that is not within the Bezier curve set.'
     
     return idx
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------
+#MILLARD MODEL
+#Numerical comparison of the Millard curves with the characteristics of De Groote et al.,
+#without plotting
+#--------------------------------------------------------------------------------------
+import numpy as np
+from math import log
+from Mathematical_expressions_for_muscle_tendon_characteristics_De_Groote import f_a, f_p, f_v, f_t, kT, c1, c2, c3
+from calcBezierYFcnXDerivatives import calcBezierYFcnXDerivatives
+
+#Characteristics of the De Groote model, by curve name
+DeGrooteCurves = {'active': f_a, 'passive': f_p, 'forceVelocity': f_v, 'tendon': f_t}
+
+#Domains of comparison of the curves, those of the figures of Main.py
+defaultComparisonDomains = {'active': (0.2, 2.0),
+                            'passive': (1.0, 1.65),
+                            'forceVelocity': (-1.0, 1.0),
+                            'tendon': ((1/kT)*log(c3/c1)+c2, 1.05)}
+
+#Grids and De Groote values computed so far, by (name, domain, npts)
+DeGrooteGridCache = {}
+
+def DeGrooteGrid(name, domain, npts):
+
+    """Uniform grid of npts points over domain and the De Groote curve name
+     on it, computed once"""
+
+    key = (name, tuple(domain), npts)
+    grid = DeGrooteGridCache.get(key)
+    if grid is None:
+        x = np.linspace(domain[0], domain[1], npts)
+        grid = (x, DeGrooteCurves[name](x))
+        DeGrooteGridCache[key] = grid
+    return grid
+
+def calcModelCurveErrors(curveSets, npts=1000, domains=None):
+
+    """ Distance between the Millard curves and the De Groote characteristics,
+     evaluated on dense uniform grids shared by all the curve sets:
+
+        diff(x) = yMillard(x) - yDeGroote(x)   on [x0, x1]
+
+        rms    = sqrt( int_x0^x1 diff^2 dx / (x1-x0) )
+        maxAbs = max |diff|
+        area   = int_x0^x1 |diff| dx
+
+     The integrals are computed with the trapezoidal rule. The De Groote
+     values are computed once per grid and cached. The Millard curves are
+     evaluated in one vectorized call per curve (calcBezierYFcnXDerivatives),
+     so the cost of a set is about that of 4 x npts Newton solves, done in
+     numpy: a few ms for npts = 1000, e.g. in the cost function of an
+     optimizer fitting the parameters of the Millard curves.
+
+     @param curveSets: a dict {name: curveParams}, or a list of such dicts
+                       (one per parameter set), name being 'active',
+                       'passive', 'forceVelocity' or 'tendon'. A set may
+                       hold only some of the curves; a curve missing from
+                       a set gets nan errors.
+     @param npts     : number of points of the grids
+     @param domains  : dict {name: (x0, x1)} overriding some of the
+                       defaultComparisonDomains
+
+     @return errors: {name: {'rms': ..., 'maxAbs': ..., 'area': ...}} for
+                     every curve present in at least one set, each error
+                     being a float for a single dict, an array with one
+                     value per set for a list"""
+
+    single = isinstance(curveSets, dict)
+    if single:
+        curveSets = [curveSets]
+    domainsUsed = dict(defaultComparisonDomains)
+    if domains is not None:
+        domainsUsed.update(domains)
+
+    names = [name for name in DeGrooteCurves if any(name in curveSet for curveSet in curveSets)]
+    errors = {}
+    for name in names:
+        x, yDeGroote = DeGrooteGrid(name, domainsUsed[name], npts)
+        x0, x1 = domainsUsed[name]
+        h = (x1-x0)/(npts-1)
+        rms = np.full(len(curveSets), np.nan)
+        maxAbs = np.full(len(curveSets), np.nan)
+        area = np.full(len(curveSets), np.nan)
+        for k, curveSet in enumerate(curveSets):
+            if name not in curveSet:
+                continue
+            diff = np.abs(calcBezierYFcnXDerivatives(x, curveSet[name], 0)[0][0] - yDeGroote)
+            #trapezoidal rule on the uniform grid
+            diff2 = diff*diff
+            rms[k] = np.sqrt(h*(diff2.sum()-0.5*(diff2[0]+diff2[-1]))/(x1-x0))
+            maxAbs[k] = diff.max()
+            area[k] = h*(diff.sum()-0.5*(diff[0]+diff[-1]))
+        if single:
+            errors[name] = {'rms': float(rms[0]), 'maxAbs': float(maxAbs[0]), 'area': float(area[0])}
+        else:
+            errors[name] = {'rms': rms, 'maxAbs': maxAbs, 'area': area}
+    return errors
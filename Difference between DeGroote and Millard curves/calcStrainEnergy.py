@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------
+#MILLARD MODEL
+#Elastic potential energy of the tendon and of the passive fiber, for energy bookkeeping
+#--------------------------------------------------------------------------------------
+from calcBezierYFcnXDerivatives import calcBezierYFcnXDerivatives
+
+def calcStrainEnergy(lN, curveParams, fiso, lref):
+
+    """Elastic potential energy stored in an element whose normalized force
+     is the Bezier curve f(lN):
+
+       PE = fiso * lref * int_xmin^lN f(l) dl
+
+     The integral is exact (createBezierIntegralTable) and lN can be an
+     array, so the energy of a whole set of muscles can be updated at every
+     time step.
+
+        tendon        : calcStrainEnergy(l_TN, tendonForceLengthCurve, F_0m, ls_T)
+        passive fiber : calcStrainEnergy(l_MN, fiberForceLengthCurve, F_0m, l0_M)
+
+     @param lN: normalized length, a scalar or an array
+     @param curveParams: the tendon or passive fiber force length curve
+     @param fiso: maximal isometric force of the muscle
+     @param lref: length used to normalize lN (tendon slack length, optimal
+                  fiber length)
+
+     @returns PE, the energy at lN (0 below the slack length xmin)"""
+
+    return fiso*lref*calcBezierYFcnXDerivatives(lN, curveParams, 0, True)[1]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------
+#MILLARD MODEL
+#Exact integral of the Bezier spline curves: one polynomial in u per section and a
+#cumulative table of the section integrals
+#--------------------------------------------------------------------------------------
+import weakref
+import numpy as np
+from calc1DBezierCurveDerivatives import bezierPowerMatrix
+from createSectionIndex import createSectionIndex, curveSectionIndex
+
+def createBezierIntegralTable(xpts, ypts):
+
+    """On a section, the integral of y dx is the integral of y(u) x'(u) du: the
+     product of the degree n and n-1 power basis polynomials of y(u) and x'(u)
+     is a polynomial of degree 2n-1, so its antiderivative
+
+       P(u) = int_0^u y(s) x'(s) ds
+
+     is an exact polynomial of degree 2n. With the cumulative sums of the
+     section integrals, the integral of the curve from xmin is, on section col,
+
+       int_xmin^x(u) y dx = prefix[col] + P_col(u)
+
+     @param xpts: n+1 x m matrix of the x control points (curveParams[0])
+     @param ypts: m x n+1 matrix of the y control points (curveParams[1])
+
+     @returns integralTable=(coefs,prefix,integralMax)
+
+            coefs      : 2n+1 x m matrix, coefs[k,col] is the coefficient of
+                         u^k of P_col(u)
+            prefix     : integral of the curve from xmin to the start (u=0) of
+                         each section
+            integralMax: integral of the curve from xmin to xmax"""
+
+    xpts = np.asarray(xpts, dtype=float)
+    ypts = np.asarray(ypts, dtype=float)
+    n = xpts.shape[0]-1
+    nsections = xpts.shape[1]
+    C, starts = bezierPowerMatrix(n)
+    yCoefs = C[starts[0]:starts[1]].dot(ypts.T)
+    dxCoefs = C[starts[1]:starts[2]].dot(xpts)
+
+    coefs = np.zeros((2*n+1, nsections))
+    for col in range(nsections):
+        product = np.convolve(yCoefs[:,col], dxCoefs[:,col])
+        coefs[1:,col] = product/np.arange(1, 2*n+1)
+
+    #integral over each section, accumulated in the order of the sections and
+    #shifted so that the integral is 0 at xmin
+    sectionIntegrals = coefs.sum(axis=0)
+    prefix = np.concatenate(([0.], np.cumsum(sectionIntegrals)[:-1]))
+    dxSign = createSectionIndex(xpts)[2]
+    if dxSign < 0:
+        prefix = prefix-sectionIntegrals.sum()
+
+    return (np.ascontiguousarray(coefs), prefix, float(dxSign*sectionIntegrals.sum()))
+
+def calcBezierIntegralPolynomial(u, c):
+
+    """P(u) from its power basis coefficients c (Horner's scheme): c is a list
+     of Python floats for a scalar u, or an array whose first axis is the
+     coefficient, broadcast against u"""
+
+    val = c[-1]+0*u
+    for k in range(len(c)-2, -1, -1):
+        val = val*u + c[k]
+    return val
+
+def calcIntegralExtrapolation(x, curveParams):
+
+    """Integral of the curve beyond xmax. The curve is extrapolated
+     linearly there, so its integral grows quadratically from its value at
+     xmax."""
+
+    x0 = curveSectionIndex(curveParams)[4]
+    y0 = curveIntegralTable(curveParams)[2]
+    f1 = curveParams[3][1]
+    f2 = curveParams[4][1]
+    return y0 + f1*(x-x0) + (0.5*f2)*(x-x0)**2
+
+#Integral tables of the curves evaluated so far, by id of their matrices of control points
+integralTableCache = {}
+
+def curveIntegralTable(curveParams):
+
+    """Integral table of the Bezier spline curveParams=(xpts,ypts,...), built on
+     the first call and cached as long as xpts and ypts are alive."""
+
+    xpts = curveParams[0]
+    ypts = curveParams[1]
+    key = (id(xpts), id(ypts))
+    cached = integralTableCache.get(key)
+    if cached is None or cached[0]() is not xpts or cached[1]() is not ypts:
+        forget = lambda ref, key=key: integralTableCache.pop(key, None)
+        cached = (weakref.ref(xpts, forget), weakref.ref(ypts, forget), createBezierIntegralTable(xpts, ypts))
+        integralTableCache[key] = cached
+    return cached[2]
@@ -7,15 +7,16 @@
     #https://github.com/mjhmilla/Millard2012EquilibriumMuscleMatlabPort/blob/master/src/createCurveIntegralStructure.m
 #--------------------------------------------------------------------------------------
 #Edited by christian bou chahine
-from calcBezierYFcnXDerivative import calcBezierYFcnXDerivative
+from calcBezierYFcnXDerivatives import calcBezierYFcnXDerivatives
 from ComplementaryFonc import minmin,maxmax
-from scipy.integrate import solve_ivp
 import numpy as np
 
-def createCurveIntegralStructure(curveParams, npts, tol, xScaling):
+def createCurveIntegralStructure(curveParams, npts, xScaling):
 
-    """Numerically evaluates the integral at npts over the domain of the 2D 
+    """Evaluates the integral at npts over the domain of the 2D 
      Bezier curve defined by the matrix of x control points and y control.
+     The integral is exact: on each section it is a polynomial in u
+     (createBezierIntegralTable), so no ODE has to be integrated.
      The first and second derivative of the curve integral are also evaluated
      at these points so that it is possible to interpolate the curve using a
      quintic hermine spline.
@@ -35,7 +36,7 @@ def createCurveIntegralStructure(curveParams, npts, tol, xScaling):
     
      @param npts: number of intermediate points between xmin and xmax to
                   evaluate the integeral.
-     @param tol: relative and absolute tolerance on the integral.
+     @param xScaling: scaling of x, stored with the integral
     
      @return integralStruct: A structure containing the numerically calculated
                              integral, its first and second derivative so that 
@@ -48,7 +49,6 @@ def createCurveIntegralStructure(curveParams, npts, tol, xScaling):
                           .y1ptsN: '' integral's first derivative.
                           .y2ptsN: '' integral's 2nd derivative."""
 
-    fcn = lambda t,x: calcBezierYFcnXDerivative(t, curveParams, 0)
     x=curveParams[0]
     
     xmin = minmin(x)
@@ -56,18 +56,13 @@ def createCurveIntegralStructure(curveParams, npts, tol, xScaling):
     
     xv=np.array([xmin+i*(xmax-xmin)/(npts-1) for i in range(npts)] ) 
     
-    sol=solve_ivp(fcn,[xmin,xmax],[0],rtol=tol,atol=tol,dense_output=True)
-    ye=sol.sol(xv) 
+    #integral, and its first and second derivative: the curve and its slope
+    (y,dydx),ye = calcBezierYFcnXDerivatives(xv, curveParams, 1, True)
     
     xptsN=np.resize(xv,new_shape=(len(xv),1))
-    yptsN=np.resize(ye,new_shape=(np.shape(ye)[1],1))
-    
-    y1ptsN = np.zeros(shape=yptsN.shape)
-    y2ptsN = np.zeros(shape=yptsN.shape)
-
-    for i in range(yptsN.shape[1]):
-       y1ptsN[0][i] =  calcBezierYFcnXDerivative(xptsN[i], curveParams, 0) 
-       y2ptsN[0][i] =  calcBezierYFcnXDerivative(xptsN[i], curveParams, 1) 
+    yptsN=np.resize(ye,new_shape=(len(ye),1))
+    y1ptsN=np.resize(y,new_shape=(len(y),1))
+    y2ptsN=np.resize(dydx,new_shape=(len(dydx),1))
     
     integralStruct=(xptsN,yptsN,y1ptsN,y2ptsN,xScaling)
    
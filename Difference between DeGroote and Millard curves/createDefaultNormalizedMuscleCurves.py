@@ -12,7 +12,7 @@ from calcBezierYFcnXCurveSampleVector import calcBezierYFcnXCurveSampleVector
 import matplotlib.pyplot as plt
 
 #Model comparison
-def ModelCurvesComparison(DeGrooteModel,curveParamVector,curveSampleParams,npts,save):
+def ModelCurvesComparison(DeGrooteModel,curveParamVector,curveSampleParams,npts,save,parametric=True):
     
     """Fonction qui va tracer les différentes courbes des deux modèles pour pouvoir les comparer
     
@@ -28,10 +28,15 @@ def ModelCurvesComparison(DeGrooteModel,curveParamVector,curveSampleParams,npts,
     
     -npts int, le nb de point que l'on choisit
     
-    -save bol, True si l'on souhaite sauvegarder les courbes, False sinon"""
+    -save bol, True si l'on souhaite sauvegarder les courbes, False sinon
     
+    -parametric bol, True pour échantillonner les courbes de Millard en u, sans
+    inverser x(u) (calcBezierYFcnXParametricSample), False pour une grille uniforme en x"""
+    
+    curveSamples_M = []
     for i in range(len(DeGrooteModel)):
-        curveSample_M = calcBezierYFcnXCurveSampleVector(curveParamVector[i],npts)
+        curveSample_M = calcBezierYFcnXCurveSampleVector(curveParamVector[i],npts,parametric)
+        curveSamples_M.append(curveSample_M)
         
         xmin =min(min(curveSample_M[0]),DeGrooteModel[i][2])
         xmax = max(max(curveSample_M[0]),DeGrooteModel[i][3])
@@ -59,8 +64,8 @@ def ModelCurvesComparison(DeGrooteModel,curveParamVector,curveSampleParams,npts,
     """ Pour une meilleure visualisation de la force musculaire, 
     on représente ici la force active et passive sur un même graphique:"""
         
-    curveSample1 = calcBezierYFcnXCurveSampleVector(curveParamVector[0],npts)
-    curveSample2 = calcBezierYFcnXCurveSampleVector(curveParamVector[1],npts)
+    curveSample1 = curveSamples_M[0]
+    curveSample2 = curveSamples_M[1]
     
     xmin = min(min(curveSample1[0]),min(curveSample2[0]),DeGrooteModel[0][2],DeGrooteModel[1][2])
     xmax = max(max(curveSample1[0]),max(curveSample2[0]),DeGrooteModel[0][3],DeGrooteModel[1][3])
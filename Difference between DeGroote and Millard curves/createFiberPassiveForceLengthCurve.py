@@ -110,7 +110,7 @@ def createFiberForceLengthCurve(eZero, eIso,kLow, kIso, curviness,computeIntegra
     
     if(computeIntegral == 1):
         xScaling = eIso
-        integral = createCurveIntegralStructure(fiberForceLengthCurve,1000,1e-12,xScaling)   
+        integral = createCurveIntegralStructure(fiberForceLengthCurve,1000,xScaling)   
        
     fiberForceLengthCurve=(xpts,ypts,xEnd,yEnd,dydxEnd,d2ydx2End,integral)
     
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------
+#MILLARD MODEL
+#Section lookup structure of the Bezier splines, used by calcIndex
+#--------------------------------------------------------------------------------------
+import weakref
+import numpy as np
+
+def createSectionIndex(ptsM):
+
+    """Builds, once per curve, the structure that calcIndex uses to find the
+     spline section containing a value with a binary search.
+
+     @param ptsM: either the 2 x n matrix of the n sub intervals
+                  [ptsM(0,i), ptsM(1,i)] passed to calcIndex, or the n x m
+                  matrix of x control points of a Bezier spline (curveParams[0]),
+                  whose sections go from its first to its last row.
+
+     @returns sectionIndex=(starts,ends,dxSign,xmin,xmax)
+
+            starts, ends: the start and end of each section, multiplied by dxSign
+                          so that they are increasing
+            dxSign      : 1 if the sections are increasing, -1 if decreasing
+            xmin, xmax  : the smallest and largest point of ptsM"""
+
+    ptsM = np.asarray(ptsM, dtype=float)
+    dxSign = 1
+    if ptsM[-1,0]-ptsM[0,0] < 0:
+        dxSign = -1
+    starts = np.ascontiguousarray(dxSign*ptsM[0,:])
+    ends = np.ascontiguousarray(dxSign*ptsM[-1,:])
+    return (starts, ends, dxSign, ptsM.min(), ptsM.max())
+
+#Section indexes of the curves evaluated so far, by id of their matrix of x control points
+sectionIndexCache = {}
+
+def curveSectionIndex(curveParams):
+
+    """Section index of the Bezier spline curveParams=(xpts,ypts,...), built on
+     the first call and cached as long as xpts is alive."""
+
+    xpts = curveParams[0]
+    key = id(xpts)
+    cached = sectionIndexCache.get(key)
+    if cached is None or cached[0]() is not xpts:
+        cached = (weakref.ref(xpts, lambda ref, key=key: sectionIndexCache.pop(key, None)), createSectionIndex(xpts))
+        sectionIndexCache[key] = cached
+    return cached[1]
@@ -115,7 +115,7 @@ def createTendonForceLengthCurve( eIso, kIso,fToe, curviness,computeIntegral):
     
     if(computeIntegral == 1):
         xScaling = eIso
-        integral =createCurveIntegralStructure(tendonForceLengthCurve,1000,1e-12,xScaling);  
+        integral =createCurveIntegralStructure(tendonForceLengthCurve,1000,xScaling);  
         
     tendonForceLengthCurve=(xpts,ypts,xEnd,yEnd,dydxEnd,d2ydx2End,integral)
     
@@ -0,0 +1,105 @@
+import time
+import numpy as np
+
+#Per-phase timing of a fixed-step simulation loop:
+#
+#    timer = PhaseTimer(["forward_kinematics", "muscle_solve", "aba"], dt, report_every=100)
+#    for k in range(N):
+#        timer.start()
+#        pin.forwardKinematics(model, data, q)
+#        timer.lap("forward_kinematics")
+#        ...
+#        time.sleep(timer.stop())
+#
+#Every lap is kept in a rolling window of the last `window` steps, from which the percentiles are taken. stop()
+#closes the step: it counts a deadline miss when the step took longer than dt, prints the summary line every
+#`report_every` steps and returns the time left to sleep to stay real time.
+
+class PhaseTimer:
+
+    def __init__(self, phases, dt, window=1000, report_every=0, clock=time.perf_counter):
+        self.phases = list(phases)
+        self.dt = dt
+        self.window = window
+        self.report_every = report_every
+        self.clock = clock
+        #one ring buffer per phase plus the whole step, in seconds
+        self.samples = {name: np.zeros(window) for name in self.phases+["step"]}
+        self.current = dict.fromkeys(self.phases, 0.)
+        self.steps = 0
+        self.deadline_misses = 0
+        self.t_start = None
+        self.t_step = None
+        self.t_lap = None
+
+    def start(self):
+        self.t_step = self.t_lap = self.clock()
+        if self.t_start is None:
+            self.t_start = self.t_step
+        for name in self.phases:
+            self.current[name] = 0.
+
+    #time spent since the last start() or lap(), added to phase `name` of the current step
+    def lap(self, name):
+        t = self.clock()
+        self.current[name] += t-self.t_lap
+        self.t_lap = t
+
+    #closes the step and returns the time to sleep to keep the loop at real time
+    def stop(self):
+        t = self.clock()
+        busy = t-self.t_step
+        i = self.steps % self.window
+        for name in self.phases:
+            self.samples[name][i] = self.current[name]
+        self.samples["step"][i] = busy
+        self.steps += 1
+        if busy > self.dt:
+            self.deadline_misses += 1
+        if self.report_every and self.steps % self.report_every == 0:
+            print(self.summary())
+        return max(0., self.dt-busy)
+
+    #the (at most `window`) last samples of one phase, not in chronological order
+    def window_samples(self, name):
+        return self.samples[name][:min(self.steps, self.window)]
+
+    #simulated time over wall-clock time since the first step; > 1 means faster than real time
+    def real_time_factor(self):
+        if self.steps == 0:
+            return float("nan")
+        return self.steps*self.dt/(self.clock()-self.t_start)
+
+    #name: {"p50", "p99", "mean", "max"} in seconds over the window, for every phase and for the whole "step"
+    def stats(self):
+        stats = {}
+        for name in self.phases+["step"]:
+            x = self.window_samples(name)
+            if len(x) == 0:
+                stats[name] = dict.fromkeys(("p50", "p99", "mean", "max"), float("nan"))
+                continue
+            p50, p99 = np.percentile(x, [50, 99])
+            stats[name] = {"p50": p50, "p99": p99, "mean": x.mean(), "max": x.max()}
+        return {
+            "phases": stats,
+            "steps": self.steps,
+            "deadline_misses": self.deadline_misses,
+            "real_time_factor": self.real_time_factor(),
+        }
+
+    def summary(self):
+        stats = self.stats()
+        phases = " ".join("%s %.2f/%.2f" % (name, 1e3*s["p50"], 1e3*s["p99"]) for name, s in stats["phases"].items())
+        return "[%d steps] p50/p99 ms: %s | misses %d | RTF %.2f" % (self.steps, phases, self.deadline_misses, stats["real_time_factor"])
+
+#Stand-in for PhaseTimer when the loop is not timed
+class NullTimer:
+
+    def start(self):
+        pass
+
+    def lap(self, name):
+        pass
+
+    def stop(self):
+        return 0.
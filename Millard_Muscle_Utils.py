@@ -0,0 +1,132 @@
+import os
+import sys
+import numpy as np
+from types import SimpleNamespace
+from DeGroote_Muscle_Utils import ode_DG, FV_calc, ode_DG_jac, FM_calc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Difference between DeGroote and Millard curves"))
+
+from BezierCurve import BezierCurve
+from CurveTable import CurveTable
+from cachedCurve import cachedCurve
+from createFiberActiveForceLengthCurve import createFiberActiveForceLengthCurve
+from createFiberPassiveForceLengthCurve import createFiberForceLengthCurve
+from createFiberForceVelocityCurve2018 import createFiberForceVelocityCurve2018
+from createTendonForceLengthCurve import createTendonForceLengthCurve
+from createInverseBezierCurve import createInverseBezierCurve
+
+#Millard muscle model: the force balance of ode_DG with the Bezier curves of Millard et al. instead of the
+#characteristics of DeGroote et al. The curves are the default ones of createDefaultNormalizedMuscleCurves (see Main.py
+#of the Millard directory), with the two "hacks" that make the explicit fiber velocity well defined: the active
+#force-length curve never goes below 0.1, and the force-velocity curve has a non-zero slope at both ends, so that
+#it can be inverted.
+
+#Active muscle force-length
+lce0 = 0.47-0.0259
+lce1 = 0.73
+lce2 = 1.0
+lce3 = 1.8123
+minActiveForceLengthValue = 0.1
+plateauSlope = 0.8616
+activeCurviness = 1.0
+#-------------------------
+#Passive muscle force-length
+eZero = 0
+eIsoP = 0.7
+kLowP = 0.2
+kIsoP = 2/(eIsoP-eZero)
+passiveCurviness = 0.75
+#-------------------------
+#Tendon force-length
+eIsoT = 0.049
+kIsoT = 1.375/eIsoT
+fToe = 2.0/3.0
+tendonCurviness = 0.5
+#-------------------------
+#Muscle force-velocity
+fmaxE = 1.4
+dydxNearE = 0.15
+dydxNearC = 0.15
+fvAtHalfVMax = 0.15
+eccCurviness = 0.9
+#-------------------------
+
+#The curves, built once per process (cachedCurve, in memory) and compiled (BezierCurve)
+active_curve = BezierCurve(cachedCurve(createFiberActiveForceLengthCurve, lce0, lce1, lce2, lce3, minActiveForceLengthValue, plateauSlope, activeCurviness, 0))
+passive_curve = BezierCurve(cachedCurve(createFiberForceLengthCurve, eZero, eIsoP, kLowP, kIsoP, passiveCurviness, 0))
+tendon_curve = BezierCurve(cachedCurve(createTendonForceLengthCurve, eIsoT, kIsoT, fToe, tendonCurviness, 0))
+force_velocity_curve = cachedCurve(createFiberForceVelocityCurve2018, fmaxE, dydxNearE, dydxNearC, 0, dydxNearE, fvAtHalfVMax, eccCurviness)
+inverse_force_velocity_curve = BezierCurve(createInverseBezierCurve(force_velocity_curve))
+#finv_v is evaluated at every call of ode_Millard: it goes through a quintic Hermite table of the inverse curve on a
+#uniform grid of force (CurveTable, error below 1e-9 on the velocity), which needs no Newton iteration on u
+inverse_force_velocity_table = CurveTable(inverse_force_velocity_curve.params(), 1e-9)
+
+#Section and u of the last single value evaluated on each curve, by id of the curve. Successive calls of an integrator
+#evaluate a curve at close values, so the Newton iteration on u starts from the previous u (2 to 3 evaluations of
+#x(u) instead of 4 to 5 from the linear guess).
+last_solution = {}
+
+#der-th derivative of a compiled curve or of a curve table at a single value, on Python floats
+def curve_value_scalar(curve, x, der):
+    if not isinstance(curve, BezierCurve) or x < curve.xmin or x > curve.xmax:
+        return curve.derivatives(x, der)[0][der]
+    col = curve.section(x)
+    col0, u0 = last_solution.get(id(curve), (-1, None))
+    u = curve.solveU(x, col, u0 if col == col0 else None)[0]
+    last_solution[id(curve)] = (col, u)
+    return curve.sectionDerivatives(u, col, der)[der]
+
+#der-th derivative of a compiled curve or of a curve table, elementwise. A single value (the calls of solve_ivp and of the muscle
+#integrators) is evaluated on Python floats, which is several times faster than the array path.
+def curve_value(curve, x, der=0):
+    if isinstance(x, float):
+        return curve_value_scalar(curve, x, der)
+    x = np.asarray(x, dtype=float)
+    if x.size == 1:
+        return np.full(x.shape, curve_value_scalar(curve, x.item(), der))
+    return curve.derivatives(x, der)[0][der]
+
+#The characteristics, with the names used by DeGroote_Muscle_Utils
+def f_a_Millard(l_MN):
+    return curve_value(active_curve, l_MN)
+
+def df_a_Millard(l_MN):
+    return curve_value(active_curve, l_MN, 1)
+
+def f_p_Millard(l_MN):
+    return curve_value(passive_curve, l_MN)
+
+def df_p_Millard(l_MN):
+    return curve_value(passive_curve, l_MN, 1)
+
+def f_t_Millard(l_TN):
+    return curve_value(tendon_curve, l_TN)
+
+def df_t_Millard(l_TN):
+    return curve_value(tendon_curve, l_TN, 1)
+
+def finv_v_Millard(FM):
+    return curve_value(inverse_force_velocity_table, FM)
+
+def dfinv_v_Millard(FM):
+    return curve_value(inverse_force_velocity_table, FM, 1)
+
+#Curve backend of the Millard model, with the interface of closed_form_curves: it can be passed as the `curves`
+#argument of ode_DG, FV_calc, ode_DG_jac and FM_calc, or installed with set_curve_backend
+millard_curves = SimpleNamespace(f_a=f_a_Millard, df_a=df_a_Millard, f_p=f_p_Millard, df_p=df_p_Millard, f_t=f_t_Millard, df_t=df_t_Millard, finv_v=finv_v_Millard, dfinv_v=dfinv_v_Millard)
+
+#muscle force
+def FM_Millard(l_MN, a):
+    return FM_calc(l_MN, a, millard_curves)
+
+#fiber velocity of the Millard model, same signature as ode_DG
+def ode_Millard(t, l_MN, l_MT, a,l0_M,alpha0,ls_T,vmax_M):
+    return ode_DG(t, l_MN, l_MT, a, l0_M, alpha0, ls_T, vmax_M, millard_curves)
+
+#force-velocity multiplier required by the force balance of ode_Millard, and its derivative with respect to l_MN
+def FV_Millard(l_MN, l_MT, a,l0_M,alpha0,ls_T):
+    return FV_calc(l_MN, l_MT, a, l0_M, alpha0, ls_T, millard_curves)
+
+#analytic Jacobian d(dl_MN/dt)/dl_MN of ode_Millard, evaluated elementwise
+def ode_Millard_jac(t, l_MN, l_MT, a,l0_M,alpha0,ls_T,vmax_M):
+    return ode_DG_jac(t, l_MN, l_MT, a, l0_M, alpha0, ls_T, vmax_M, millard_curves)
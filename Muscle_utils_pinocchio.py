@@ -1,11 +1,8 @@
 import numpy as np
-import sympy
-from sympy import symbols, Eq, solve
+from math import sqrt, sin, asinh
 from DeGroote_Muscle_Utils import *
-import matplotlib
-matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
 from scipy.integrate import solve_ivp
+from scipy import sparse
 
 
 t_simulation = 0.01
@@ -16,13 +13,280 @@ alpha0 = 0.209
 activation = 0.8
 v_max = 10
 
+# Fiber velocity, its Jacobian and the muscle force of a muscle model. Millard_Muscle_Utils builds the Bezier curves
+# and the inverse force-velocity table when it is imported, so it is only imported once the Millard model is asked for.
+def muscle_model(model):
+    if model == "DeGroote":
+        return ode_DG, ode_DG_jac, FM_calc
+    if model == "Millard":
+        from Millard_Muscle_Utils import ode_Millard, ode_Millard_jac, FM_Millard
+        return ode_Millard, ode_Millard_jac, FM_Millard
+    raise ValueError("unknown muscle model: %s" % model)
+
 # Solving for the muscle length using differential equation then calculating FM
-def l_MN_calculation(l_MT, l_MN):
-    sol = solve_ivp(lambda t, l_MN: ode_DG(t, l_MN, l_MT, activation, l0_M, alpha0, ls_T, v_max), [0, t_simulation],[l_MN], methode="Radau", rtol=1e-6, atol=1e-6,t_eval=np.linspace(0, t_simulation, int(t_simulation * 200)), dense_output=True)
+# method: any solve_ivp method; the implicit ones ("Radau", "BDF", "LSODA") are given the analytic Jacobian of the model
+# model: "DeGroote" (closed form characteristics) or "Millard" (Bezier curves, Millard_Muscle_Utils)
+def l_MN_calculation(l_MT, l_MN, method="LSODA", model="DeGroote"):
+    ode, ode_jac, FM_fcn = muscle_model(model)
+    options = {}
+    if method in ("Radau", "BDF", "LSODA"):
+        options["jac"] = lambda t, l_MN: np.diag(ode_jac(t, l_MN, l_MT, activation, l0_M, alpha0, ls_T, v_max))
+    sol = solve_ivp(lambda t, l_MN: ode(t, l_MN, l_MT, activation, l0_M, alpha0, ls_T, v_max), [0, t_simulation],[l_MN], method=method, rtol=1e-6, atol=1e-6, **options)
     l_MN = sol.y[0][-1]
-    FM = FM_calc(l_MN, activation)
+    FM = FM_fcn(l_MN, activation)
     return FM
 
+# Raised by MuscleIntegrator when the fiber length leaves the domain where ode_DG is finite and cannot be recovered
+class MuscleDivergenceError(RuntimeError):
+    pass
+
+# Stateful integrator of one muscle fiber, to be called once per control step.
+# The fiber length, the last accepted step size and its error estimate are kept between calls, so each call
+# resumes where the previous one stopped instead of building a new solve_ivp problem.
+# ode_DG is advanced with the L-stable Rosenbrock pair of Shampine & Reichelt (MATLAB ode23s) using ode_DG_jac;
+# all the work is done on Python floats, nothing is allocated per step.
+class MuscleIntegrator:
+    d = 1/(2+sqrt(2))
+    e32 = 6+sqrt(2)
+
+    def __init__(self, l_MN=1., activation=activation, l0_M=l0_M, alpha0=alpha0, ls_T=ls_T, v_max=v_max, dt=t_simulation, rtol=1e-6, atol=1e-6):
+        self.l_MN = float(l_MN)
+        self.activation = activation
+        self.l0_M = l0_M
+        self.alpha0 = alpha0
+        self.ls_T = ls_T
+        self.v_max = v_max
+        self.dt = dt
+        self.rtol = rtol
+        self.atol = atol
+        self.h = dt       # last accepted step size
+        self.error = 0.   # normalized error estimate of the last accepted step
+        self.nfev = 0
+        self.njev = 0
+        self.nsteps = 0
+        self.nrejected = 0
+
+    def rhs(self, l_MN, l_MT):
+        self.nfev += 1
+        # a trial far outside the domain of ode_DG gives a nan, which integrate rejects: numpy overflows to inf/nan
+        # (the warnings are silenced), while l_MN**2 on a Python float raises OverflowError
+        if not np.isfinite(l_MN):
+            return float("nan")
+        try:
+            with np.errstate(over="ignore", invalid="ignore"):
+                v = float(ode_DG(0, l_MN, l_MT, self.activation, self.l0_M, self.alpha0, self.ls_T, self.v_max))
+        except OverflowError:
+            return float("nan")
+        return v if np.isfinite(v) else float("nan")
+
+    def jac(self, l_MN, l_MT):
+        self.njev += 1
+        return float(ode_DG_jac(0, l_MN, l_MT, self.activation, self.l0_M, self.alpha0, self.ls_T, self.v_max))
+
+    # advances the fiber length by dt (default: one control step) with the muscle-tendon length held at l_MT
+    def integrate(self, l_MT, dt=None):
+        if dt is None:
+            dt = self.dt
+        d = self.d
+        e32 = self.e32
+        y = self.l_MN
+        h = self.h
+        t = 0.
+        F0 = self.rhs(y, l_MT)
+        if F0 != F0:
+            raise MuscleDivergenceError("MuscleIntegrator: non-finite fiber velocity at l_MN = %g, l_MT = %g" % (y, l_MT))
+        J = self.jac(y, l_MT)
+        while t < dt:
+            last = h >= dt-t
+            if last:
+                h_step = dt-t
+            else:
+                h_step = h
+            W = 1-h_step*d*J
+            k1 = F0/W
+            F1 = self.rhs(y+0.5*h_step*k1, l_MT)
+            k2 = (F1-k1)/W+k1
+            y_new = y+h_step*k2
+            F2 = self.rhs(y_new, l_MT)
+            k3 = (F2-e32*(k2-F1)-2*(k1-F0))/W
+            error = abs(h_step*(k1-2*k2+k3)/6)/(self.atol+self.rtol*max(abs(y), abs(y_new)))
+            if error <= 1.:
+                t = dt if last else t+h_step
+                y = y_new
+                F0 = F2
+                self.error = error
+                self.nsteps += 1
+                if t < dt:
+                    J = self.jac(y, l_MT)
+                if not last:
+                    h = h_step*min(5., max(0.2, 0.8*max(error, 1e-10)**(-1/3)))
+            else:
+                self.nrejected += 1
+                if error != error:  # nan: the trial left the domain of ode_DG
+                    h = 0.2*h_step
+                else:
+                    h = h_step*max(0.2, 0.8*error**(-1/3))
+                if h < 1e-14*dt:
+                    raise MuscleDivergenceError("MuscleIntegrator: step size underflow at l_MN = %g" % y)
+        self.l_MN = y
+        self.h = h
+        return y
+
+    # drop-in for l_MN_calculation: advances one control step and returns the normalized muscle force
+    def step(self, l_MT):
+        self.integrate(l_MT)
+        return FM_calc(self.l_MN, self.activation)
+
+# Fixed-step implicit integrator of one muscle fiber for hard real-time loops.
+# Each control step of length dt is split into `substeps` backward Euler (theta=1) or trapezoidal (theta=1/2) steps
+#     l_MN = l_MN_prev + h*(theta*v + (1-theta)*v_prev),   v = ode_DG(l_MN).
+# Since ode_DG goes through sinh, the step is solved in force space, FV_calc(l_MN) = f(v) with f the inverse of the
+# force-velocity relation of ode_DG, by at most `newton_iterations` Newton iterations warm-started from the previous
+# fiber length, so the cost of a step is bounded. The residual of the implicit step, in l_MN units, is kept in `residual`.
+# step(l_MT) has the same meaning as MuscleIntegrator.step and can replace l_MN_calculation in the simulations.
+class FixedStepMuscleStepper:
+    schemes = {"backward_euler": 1., "trapezoidal": 0.5}
+
+    def __init__(self, l_MN=1., activation=activation, l0_M=l0_M, alpha0=alpha0, ls_T=ls_T, v_max=v_max, dt=t_simulation, scheme="backward_euler", substeps=1, newton_iterations=4, tol=1e-10):
+        if scheme not in self.schemes:
+            raise ValueError("scheme must be one of %s" % ", ".join(self.schemes))
+        self.l_MN = float(l_MN)
+        self.activation = activation
+        self.l0_M = l0_M
+        self.alpha0 = alpha0
+        self.ls_T = ls_T
+        self.v_max = v_max
+        self.dt = dt
+        self.scheme = scheme
+        self.theta = self.schemes[scheme]
+        self.substeps = substeps
+        self.newton_iterations = newton_iterations
+        self.tol = tol
+        self.l_MN_min = sin(alpha0)  # fibers shorter than this have no physical pennation angle
+        self.v_MN = 0.       # fiber velocity at the end of the last control step
+        self.residual = 0.   # largest residual over the substeps of the last control step
+        self.iterations = 0  # Newton iterations spent in the last control step
+
+    # nan once the fiber length has left the domain of ode_DG (see MuscleIntegrator.rhs)
+    def rhs(self, l_MN, l_MT):
+        if not np.isfinite(l_MN):
+            return float("nan")
+        try:
+            with np.errstate(over="ignore", invalid="ignore"):
+                return float(ode_DG(0, l_MN, l_MT, self.activation, self.l0_M, self.alpha0, self.ls_T, self.v_max))
+        except OverflowError:
+            return float("nan")
+
+    # advances the fiber length by one control step with the muscle-tendon length held at l_MT
+    # raises MuscleDivergenceError when a substep ends on a non-finite fiber length or velocity
+    def integrate(self, l_MT):
+        h = self.dt/self.substeps
+        theta = self.theta
+        k = self.l0_M/self.v_max
+        y = self.l_MN
+        self.residual = 0.
+        self.iterations = 0
+        v = self.rhs(y, l_MT) if theta < 1 else 0.
+        for _ in range(self.substeps):
+            y_prev = y
+            v_prev = v
+            for i in range(self.newton_iterations):
+                FM, dFM = FV_calc(y, l_MT, self.activation, self.l0_M, self.alpha0, self.ls_T)
+                # force-velocity multiplier of the fiber velocity implied by the implicit step
+                z = d2*(k*((y-y_prev)/h-(1-theta)*v_prev)/theta+d3)
+                g = float(FM)-(d4+d1*asinh(z))
+                if abs(g) <= self.tol:
+                    break
+                dg = float(dFM)-d1*d2*k/(h*theta*sqrt(1+z*z))
+                # the Newton update is not allowed to cross the lower bound of the fiber length
+                y = max(y-g/dg, 0.5*(y+self.l_MN_min))
+                self.iterations += 1
+            v = self.rhs(y, l_MT)
+            if not (np.isfinite(y) and np.isfinite(v)):
+                raise MuscleDivergenceError("FixedStepMuscleStepper: non-finite fiber %s at l_MN = %g, l_MT = %g" % ("velocity" if np.isfinite(y) else "length", y, l_MT))
+            self.residual = max(self.residual, abs(y-y_prev-h*(theta*v+(1-theta)*v_prev)))
+        self.l_MN = y
+        self.v_MN = v
+        return y
+
+    # drop-in for l_MN_calculation: advances one control step and returns the normalized muscle force
+    def step(self, l_MT):
+        self.integrate(l_MT)
+        return FM_calc(self.l_MN, self.activation)
+
+# Integrator of one fiber by name: "adaptive" (MuscleIntegrator) or a FixedStepMuscleStepper scheme
+def make_muscle(muscle_integrator, l_MN, activation, dt, l0_M=l0_M, alpha0=alpha0, ls_T=ls_T, v_max=v_max):
+    if muscle_integrator == "adaptive":
+        return MuscleIntegrator(l_MN=l_MN, activation=activation, l0_M=l0_M, alpha0=alpha0, ls_T=ls_T, v_max=v_max, dt=dt)
+    return FixedStepMuscleStepper(l_MN=l_MN, activation=activation, l0_M=l0_M, alpha0=alpha0, ls_T=ls_T, v_max=v_max, dt=dt, scheme=muscle_integrator)
+
+# Struct-of-arrays container of N muscles: the parameters and the fiber lengths are contiguous float arrays,
+# and the whole bank is advanced by a single solve_ivp call on the vectorized ode_DG.
+# Since each fiber only depends on its own length, the Jacobian is diagonal; the stiff solvers are given it either
+# analytically (jac=True) or as a diagonal sparsity pattern for finite differences (jac=False).
+class MuscleBank:
+
+    def __init__(self, l0_M=l0_M, ls_T=ls_T, alpha0=alpha0, v_max=v_max, F_0m=1., activation=activation, l_MN=1., n=None):
+        shape = np.broadcast(l0_M, ls_T, alpha0, v_max, F_0m, activation, l_MN).shape
+        if n is not None:
+            shape = np.broadcast_shapes(shape, (n,))
+        assert len(shape) == 1, "MuscleBank parameters must be scalars or 1-D arrays"
+        self.n = shape[0]
+        self.l0_M = np.array(np.broadcast_to(l0_M, shape), dtype=float)
+        self.ls_T = np.array(np.broadcast_to(ls_T, shape), dtype=float)
+        self.alpha0 = np.array(np.broadcast_to(alpha0, shape), dtype=float)
+        self.v_max = np.array(np.broadcast_to(v_max, shape), dtype=float)
+        self.F_0m = np.array(np.broadcast_to(F_0m, shape), dtype=float)
+        self.activation = np.array(np.broadcast_to(activation, shape), dtype=float)
+        self.l_MN = np.array(np.broadcast_to(l_MN, shape), dtype=float)
+        self.sparsity = sparse.identity(self.n, format="csc")
+        self.nfev = 0
+        self.njev = 0
+
+    def __len__(self):
+        return self.n
+
+    # fiber velocities dl_MN/dt of the whole bank
+    def rhs(self, t, l_MN, l_MT):
+        return ode_DG(t, l_MN, l_MT, self.activation, self.l0_M, self.alpha0, self.ls_T, self.v_max)
+
+    # diagonal of the Jacobian of rhs
+    def jac_diagonal(self, t, l_MN, l_MT):
+        return ode_DG_jac(t, l_MN, l_MT, self.activation, self.l0_M, self.alpha0, self.ls_T, self.v_max)
+
+    # advances all the fiber lengths by dt with the muscle-tendon lengths held at l_MT (scalar or one per muscle)
+    def integrate(self, l_MT, dt=t_simulation, method="LSODA", jac=True, rtol=1e-6, atol=1e-6):
+        options = {}
+        if method in ("Radau", "BDF"):
+            if jac:
+                options["jac"] = lambda t, l_MN: sparse.diags(self.jac_diagonal(t, l_MN, l_MT), format="csc")
+            else:
+                options["jac_sparsity"] = self.sparsity
+        elif method == "LSODA":
+            # banded storage of a diagonal matrix: a single row
+            options["lband"] = options["uband"] = 0
+            if jac:
+                options["jac"] = lambda t, l_MN: self.jac_diagonal(t, l_MN, l_MT)[np.newaxis, :]
+        sol = solve_ivp(lambda t, l_MN: self.rhs(t, l_MN, l_MT), [0, dt], self.l_MN, method=method, rtol=rtol, atol=atol, **options)
+        self.nfev += sol.nfev
+        self.njev += sol.njev
+        self.l_MN[:] = sol.y[:, -1]
+        return self.l_MN
+
+    # puts every fiber on its static equilibrium for the muscle-tendon lengths l_MT (scalar or one per muscle)
+    def equilibrate(self, l_MT):
+        self.l_MN[:] = equilibrate(l_MT, self.activation, self.l0_M, self.alpha0, self.ls_T, self.l_MN)
+        return self.l_MN
+
+    # normalized muscle forces
+    def FM(self):
+        return FM_calc(self.l_MN, self.activation)
+
+    # advances one control step and returns the muscle forces F_0m*FM
+    def step(self, l_MT, dt=t_simulation, method="LSODA"):
+        self.integrate(l_MT, dt, method)
+        return self.F_0m*self.FM()
+
 def pos_inse(position_second_joint, distance_insertion_to_second_joint, position_end_effector, length_2nd_joint_to_end_effector):
     x_i = position_second_joint[0] + distance_insertion_to_second_joint*(position_end_effector[0]-position_second_joint[0])/length_2nd_joint_to_end_effector
     y_i = position_second_joint[1] + distance_insertion_to_second_joint*(position_end_effector[1]-position_second_joint[1])/length_2nd_joint_to_end_effector
@@ -0,0 +1,141 @@
+import os
+import csv
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Muscle_utils_pinocchio import *
+
+#Parameter sweeps of the muscle simulations, one case per worker process:
+#
+#    cases = grid(F_0m=[110, 190], activation=[0.4, 0.8])
+#    rows = sweep("joint", cases, T=10)      # 1-DOF joint driven by the muscle (needs pinocchio)
+#    rows = sweep("fiber", cases)            # fiber alone along the l_MT(t) of the l_MN_&_FM_curve scripts
+#    write_table(rows, "sweep.csv")
+#
+#Each row of the table holds the parameters of one case followed by summary values of its simulation, and its status:
+#"ok", or "failed: <reason>" when the muscle integration diverged (MuscleDivergenceError), the summary values of the
+#case being left empty.
+#From the command line:
+#
+#    python Parameter_Sweep.py joint --F0m 110 190 --activation 0.4 0.8 -T 10 --output sweep.csv
+
+#Parameters of each kind of simulation and their defaults
+joint_defaults = {"F_0m": 190., "activation": 0.8, "l0_M": 0.55, "ls_T": 0.55, "alpha0": 0.209, "v_max": 10., "damping": 0.5}
+fiber_defaults = {"F_0m": 1., "activation": 0.4, "l0_M": 0.02, "ls_T": 0.2, "alpha0": np.pi/6, "v_max": 10.}
+
+#Cartesian product of the parameter values: grid(a=[1, 2], b=[3]) -> [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
+def grid(**axes):
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(np.atleast_1d(axes[name]).tolist() for name in names))]
+
+#1-DOF joint of one_degree_of_freedom_joint_with_muscle, simulated headless
+def run_joint(params, T=10., dt=0.01, muscle_integrator="adaptive"):
+    from one_degree_of_freedom_joint_with_muscle import build_model, simulate
+    model, geom_model = build_model()
+    t, q, v, l_MN, FM, torque = simulate(model, T, dt, params["F_0m"], params["activation"], muscle_integrator,
+                                         l0_M=params["l0_M"], ls_T=params["ls_T"], alpha0=params["alpha0"],
+                                         v_max=params["v_max"], damping_value=params["damping"])
+    return {
+        "q_final": q[-1, 0],
+        "q_min": q[:, 0].min(),
+        "q_max": q[:, 0].max(),
+        "l_MN_min": l_MN.min(),
+        "l_MN_max": l_MN.max(),
+        "FM_mean": FM.mean(),
+        "FM_max": FM.max(),
+        "torque_max": np.abs(torque).max(),
+    }
+
+#Fiber alone, with the muscle-tendon length l_MT(t) = calc_l_MT(t) of the l_MN_&_FM_curve scripts
+def run_fiber(params, T=0.7, dt=0.01, muscle_integrator="adaptive"):
+    l0_M, ls_T, alpha0, a = params["l0_M"], params["ls_T"], params["alpha0"], params["activation"]
+    n_steps = int(round(T/dt))
+    l_MT = calc_l_MT(dt*np.arange(n_steps+1), l0_M, ls_T, alpha0, l0_M)
+    l_MN = np.empty(n_steps+1)
+    l_MN[0] = equilibrate(l_MT[0], a, l0_M, alpha0, ls_T)
+    muscle = make_muscle(muscle_integrator, l_MN[0], a, dt, l0_M, alpha0, ls_T, params["v_max"])
+    for k in range(n_steps):
+        l_MN[k+1] = muscle.integrate(l_MT[k])
+    FM = params["F_0m"]*FM_calc(l_MN, a)
+    return {
+        "l_MN_final": l_MN[-1],
+        "l_MN_min": l_MN.min(),
+        "l_MN_max": l_MN.max(),
+        "FM_final": FM[-1],
+        "FM_mean": FM.mean(),
+        "FM_max": FM.max(),
+    }
+
+kinds = {"joint": (run_joint, joint_defaults), "fiber": (run_fiber, fiber_defaults)}
+
+#One case in a worker: the parameters, the summary values and the wall time of the simulation
+def _run_case(kind, params, options):
+    run, defaults = kinds[kind]
+    params = {**defaults, **params}
+    tic = time.perf_counter()
+    try:
+        row = {**params, **{name: float(value) for name, value in run(params, **options).items()}, "status": "ok"}
+    except MuscleDivergenceError as error:
+        row = {**params, "status": "failed: %s" % error}
+    row["wall_time"] = time.perf_counter()-tic
+    return row
+
+#Runs every case of `cases` (a list of parameter dicts, missing parameters take the defaults of `kind`) in a pool of
+#`processes` workers (default: one per core) and returns the rows of the table, in the order of the cases.
+#options are passed to run_joint/run_fiber (T, dt, muscle_integrator).
+def sweep(kind, cases, processes=None, **options):
+    if kind not in kinds:
+        raise ValueError("kind must be one of %s" % ", ".join(kinds))
+    defaults = kinds[kind][1]
+    for params in cases:
+        unknown = set(params)-set(defaults)
+        if unknown:
+            raise ValueError("unknown %s parameter(s): %s" % (kind, ", ".join(sorted(unknown))))
+    if processes is None:
+        processes = os.cpu_count()
+    if processes == 1:
+        return [_run_case(kind, params, options) for params in cases]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(_run_case, kind, params, options) for params in cases]
+        return [future.result() for future in futures]
+
+def write_table(rows, path):
+    with open(path, "w", newline="") as f:
+        #columns of all the rows, in order of appearance: failed cases have no summary values
+        fieldnames = list(dict.fromkeys(name for row in rows for name in row))
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parameter sweep of the muscle simulations")
+    parser.add_argument("kind", choices=list(kinds), help="joint: 1-DOF joint driven by the muscle, fiber: fiber alone along a prescribed l_MT(t)")
+    parser.add_argument("--F0m", type=float, nargs="+", help="maximal isometric force(s)")
+    parser.add_argument("--activation", type=float, nargs="+", help="activation(s)")
+    parser.add_argument("--l0M", type=float, nargs="+", help="optimal fiber length(s)")
+    parser.add_argument("--lsT", type=float, nargs="+", help="tendon slack length(s)")
+    parser.add_argument("--alpha0", type=float, nargs="+", help="pennation angle(s) at the optimal fiber length")
+    parser.add_argument("--vmax", type=float, nargs="+", help="maximal fiber velocity(ies)")
+    parser.add_argument("--damping", type=float, nargs="+", help="joint damping(s), joint only")
+    parser.add_argument("-T", type=float, help="simulated time in seconds")
+    parser.add_argument("--dt", type=float, help="time step in seconds")
+    parser.add_argument("--muscle-integrator", choices=["adaptive", "backward_euler", "trapezoidal"], default="adaptive")
+    parser.add_argument("-j", "--processes", type=int, default=None, help="number of worker processes (default: one per core)")
+    parser.add_argument("--output", default="sweep.csv", help="CSV table of the results")
+    args = parser.parse_args()
+
+    axes = {"F_0m": args.F0m, "activation": args.activation, "l0_M": args.l0M, "ls_T": args.lsT,
+            "alpha0": args.alpha0, "v_max": args.vmax, "damping": args.damping}
+    cases = grid(**{name: values for name, values in axes.items() if values is not None})
+    options = {"muscle_integrator": args.muscle_integrator}
+    if args.T is not None:
+        options["T"] = args.T
+    if args.dt is not None:
+        options["dt"] = args.dt
+
+    tic = time.perf_counter()
+    rows = sweep(args.kind, cases, args.processes, **options)
+    write_table(rows, args.output)
+    print("%d cases in %.2f s -> %s" % (len(rows), time.perf_counter()-tic, args.output))
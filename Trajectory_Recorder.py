@@ -0,0 +1,108 @@
+import os
+import glob
+import numpy as np
+
+#Streaming recorder of simulation trajectories:
+#
+#    recorder = TrajectoryRecorder("run", {"t": (), "q": (2,), "FM": ()}, chunk_size=1000)
+#    for k in range(N):
+#        ...
+#        recorder.push(t, q, FM)        # values in the order of the columns
+#    recorder.close()
+#
+#    data = load_trajectory("run")     # {"t": (n,), "q": (n, 2), "FM": (n,)}, also while the simulation runs
+#
+#ArrayRecorder has the same push interface and keeps everything in memory.
+#
+#The samples are copied into preallocated buffers of chunk_size rows; a full buffer is written to the directory as
+#the next chunk_XXXXXXXX.npz and reused, so the memory stays constant whatever the length of the run. A chunk is
+#written to a temporary file and renamed, so readers never see a partial chunk. Recording again in an existing
+#directory appends after its last chunk.
+
+chunk_pattern = "chunk_%08d.npz"
+
+#shape of one sample of a column: () for scalars, an int or a tuple for arrays
+def sample_shapes(columns):
+    return {name: (shape,) if isinstance(shape, int) else tuple(shape) for name, shape in columns.items()}
+
+def chunk_files(path):
+    return sorted(glob.glob(os.path.join(glob.escape(path), "chunk_*.npz")))
+
+class TrajectoryRecorder:
+
+    def __init__(self, path, columns, chunk_size=1000):
+        self.path = path
+        self.columns = sample_shapes(columns)
+        self.chunk_size = chunk_size
+        self.buffers = [np.empty((chunk_size,)+shape) for shape in self.columns.values()]
+        self.n = 0             # rows of the current buffer
+        self.rows_written = 0  # rows flushed to disk by this recorder
+        os.makedirs(path, exist_ok=True)
+        chunks = chunk_files(path)
+        self.chunk_index = int(os.path.basename(chunks[-1])[len("chunk_"):-len(".npz")])+1 if chunks else 0
+
+    def push(self, *values):
+        i = self.n
+        for buffer, value in zip(self.buffers, values):
+            buffer[i] = value
+        self.n = i+1
+        if self.n == self.chunk_size:
+            self.flush()
+
+    #writes the rows pushed since the last flush as a new chunk
+    def flush(self):
+        if self.n == 0:
+            return
+        name = os.path.join(self.path, chunk_pattern % self.chunk_index)
+        with open(name+".tmp", "wb") as f:
+            np.savez(f, **{column: buffer[:self.n] for column, buffer in zip(self.columns, self.buffers)})
+        os.replace(name+".tmp", name)
+        self.chunk_index += 1
+        self.rows_written += self.n
+        self.n = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.rows_written+self.n
+
+#In-memory counterpart of TrajectoryRecorder for runs of known length: one preallocated array of n rows per column
+class ArrayRecorder:
+
+    def __init__(self, columns, n):
+        self.columns = sample_shapes(columns)
+        self.arrays = {name: np.empty((n,)+shape) for name, shape in self.columns.items()}
+        self.buffers = list(self.arrays.values())
+        self.n = 0
+
+    def push(self, *values):
+        i = self.n
+        for buffer, value in zip(self.buffers, values):
+            buffer[i] = value
+        self.n = i+1
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __len__(self):
+        return self.n
+
+#All the complete chunks of a recording, concatenated: column name -> array with one row per sample
+def load_trajectory(path, columns=None):
+    chunks = []
+    for name in chunk_files(path):
+        with np.load(name) as chunk:
+            chunks.append({column: chunk[column] for column in (columns or chunk.files)})
+    if not chunks:
+        return {}
+    return {column: np.concatenate([chunk[column] for chunk in chunks]) for column in chunks[0]}
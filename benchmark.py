@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import time
+import timeit
+import platform
+import argparse
+import numpy as np
+from scipy.optimize import brentq
+
+#Micro-benchmarks of the muscle and curve hot paths.
+#
+#    python benchmark.py                                        # run everything, print the timings
+#    python benchmark.py --output results.json                  # ... and write them as JSON
+#    python benchmark.py --save-baseline baseline.json          # ... and store them as the reference
+#    python benchmark.py --baseline baseline.json --threshold 0.2
+#
+#With --baseline the run fails (exit code 1) when a case is more than `threshold` (relative) slower than in the
+#baseline. Baselines depend on the machine, store and compare them on the same one.
+
+root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, "Difference between DeGroote and Millard curves"))
+
+from DeGroote_Muscle_Utils import *
+from Muscle_utils_pinocchio import l_MN_calculation, MuscleBank
+from Millard_Muscle_Utils import ode_Millard
+
+from calc1DBezierCurveValue import calc1DBezierCurveValue
+from calcBezierYFcnXDerivative import calcBezierYFcnXDerivative
+from calcBezierYFcnXDerivatives import calcBezierYFcnXDerivatives
+from calcBezierYFcnXCurveSampleVector import calcBezierYFcnXCurveSampleVector
+from createCurveIntegralStructure import createCurveIntegralStructure
+from createFiberActiveForceLengthCurve import createFiberActiveForceLengthCurve
+from createFiberPassiveForceLengthCurve import createFiberForceLengthCurve
+from createFiberForceVelocityCurve2018 import createFiberForceVelocityCurve2018
+from createTendonForceLengthCurve import createTendonForceLengthCurve
+from createInverseBezierCurve import createInverseBezierCurve
+from BezierCurve import BezierCurve
+from CurveTable import CurveTable
+from calcModelCurveErrors import calcModelCurveErrors
+from calcStrainEnergy import calcStrainEnergy
+from calc5thOrderInterp import calc5thOrderInterp
+from QuinticHermiteInterpolator import QuinticHermiteInterpolator
+
+#Muscle parameters of the simulations
+l0_M = 0.55
+ls_T = 0.55
+alpha0 = 0.209
+activation = 0.8
+v_max = 10
+
+batch_size = 1000
+
+#Default Millard curves, with the parameters of Main.py
+def active_curve():
+    return createFiberActiveForceLengthCurve(0.47-0.0259, 0.73, 1.0, 1.8123, 0, 0.8616, 1.0, 0)
+
+def passive_curve(computeIntegral=1):
+    return createFiberForceLengthCurve(0, 0.7, 0.2, 2/0.7, 0.75, computeIntegral)
+
+def force_velocity_curve():
+    return createFiberForceVelocityCurve2018(1.4, 0.1, 0, 0, 0.15, 0.15, 0.9)
+
+def tendon_curve(computeIntegral=1):
+    return createTendonForceLengthCurve(0.049, 1.375/0.049, 2.0/3.0, 0.5, computeIntegral)
+
+#name -> function without argument timed by the suite; "scalar" cases work on one value, "batch" cases on
+#batch_size values (or on batch_size calls when the function only takes scalars)
+def make_cases():
+    cases = {}
+
+    #DeGroote muscle
+    l_MT = 1.1*(l0_M*np.cos(alpha0)+ls_T)
+    l_MN = float(equilibrate(l_MT, activation, l0_M, alpha0, ls_T))
+    rng = np.random.default_rng(0)
+    l_MT_batch = l_MT*rng.uniform(0.95, 1.05, batch_size)
+    l_MN_batch = equilibrate(l_MT_batch, activation, l0_M, alpha0, ls_T)
+    cases["ode_DG/scalar"] = lambda: ode_DG(0, l_MN, l_MT, activation, l0_M, alpha0, ls_T, v_max)
+    cases["ode_DG/batch"] = lambda: ode_DG(0, l_MN_batch, l_MT_batch, activation, l0_M, alpha0, ls_T, v_max)
+    cases["FM_calc/scalar"] = lambda: FM_calc(l_MN, activation)
+    cases["FM_calc/batch"] = lambda: FM_calc(l_MN_batch, activation)
+    cases["l_MN_calculation/scalar"] = lambda: l_MN_calculation(l_MT, l_MN)
+    cases["ode_Millard/scalar"] = lambda: ode_Millard(0, l_MN, l_MT, activation, l0_M, alpha0, ls_T, v_max)
+    cases["ode_Millard/batch"] = lambda: ode_Millard(0, l_MN_batch, l_MT_batch, activation, l0_M, alpha0, ls_T, v_max)
+    #equilibrium of the Millard fiber, so that both models integrate the same (steady) problem
+    l_MN_M = brentq(lambda l: ode_Millard(0, l, l_MT, activation, l0_M, alpha0, ls_T, v_max), 0.8, 1.5)
+    cases["l_MN_calculation[Millard]/scalar"] = lambda: l_MN_calculation(l_MT, l_MN_M, model="Millard")
+    bank = MuscleBank(l0_M, ls_T, alpha0, v_max, activation=activation, l_MN=l_MN_batch, n=batch_size)
+    cases["MuscleBank.integrate/batch"] = lambda: bank.integrate(l_MT_batch)
+
+    #Millard curves
+    curve = tendon_curve()
+    xpts = curve[0]
+    x0, x1 = xpts.min(), xpts.max()
+    x = 0.5*(x0+x1)
+    x_batch = np.linspace(x0, x1, batch_size)
+    u_batch = np.linspace(0, 1, batch_size)
+    pV = xpts[:, 0]
+    cases["calc1DBezierCurveValue/scalar"] = lambda: calc1DBezierCurveValue(0.3, pV)
+    cases["calc1DBezierCurveValue/batch"] = lambda: calc1DBezierCurveValue(u_batch, pV)
+    for der in range(-1, 4):
+        cases["calcBezierYFcnXDerivative[%d]/scalar" % der] = lambda der=der: calcBezierYFcnXDerivative(x, curve, der)
+        cases["calcBezierYFcnXDerivative[%d]/batch" % der] = lambda der=der: [calcBezierYFcnXDerivative(xk, curve, der) for xk in x_batch]
+    cases["calcBezierYFcnXDerivatives/scalar"] = lambda: calcBezierYFcnXDerivatives(x, curve, 3, True)
+    cases["calcBezierYFcnXDerivatives/batch"] = lambda: calcBezierYFcnXDerivatives(x_batch, curve, 3, True)
+    bezier = BezierCurve(curve)
+    cases["BezierCurve.derivatives/scalar"] = lambda: bezier.derivatives(x, 3)
+    cases["BezierCurve.derivatives/batch"] = lambda: bezier.derivatives(x_batch, 3)
+    cases["calcBezierYFcnXCurveSampleVector"] = lambda: calcBezierYFcnXCurveSampleVector(curve, 100)
+    cases["calcBezierYFcnXCurveSampleVector/parametric"] = lambda: calcBezierYFcnXCurveSampleVector(curve, 100, True)
+    curve_no_integral = tendon_curve(0)
+    cases["calcStrainEnergy/scalar"] = lambda: calcStrainEnergy(x, curve, 1., ls_T)
+    cases["calcStrainEnergy/batch"] = lambda: calcStrainEnergy(x_batch, curve, 1., ls_T)
+    tsol, ysol, fsol, gsol = curve[6][:4]
+    t_batch = np.linspace(tsol[0, 0], tsol[-1, 0], batch_size)
+    quintic = QuinticHermiteInterpolator(tsol, ysol, fsol, gsol)
+    cases["calc5thOrderInterp/scalar"] = lambda: calc5thOrderInterp(x, tsol, ysol, fsol, gsol)
+    cases["QuinticHermiteInterpolator/scalar"] = lambda: quintic(x)
+    cases["QuinticHermiteInterpolator/batch"] = lambda: quintic.evaluate(t_batch, 2)
+    cases["createCurveIntegralStructure"] = lambda: createCurveIntegralStructure(curve_no_integral, 1000, 1.0)
+    curve_set = {"active": active_curve(), "passive": passive_curve(0), "forceVelocity": force_velocity_curve(), "tendon": curve_no_integral}
+    cases["calcModelCurveErrors"] = lambda: calcModelCurveErrors(curve_set)
+    cases["createFiberActiveForceLengthCurve"] = active_curve
+    cases["createFiberForceLengthCurve"] = passive_curve
+    cases["createFiberForceVelocityCurve2018"] = force_velocity_curve
+    cases["createTendonForceLengthCurve"] = tendon_curve
+    fv_curve = force_velocity_curve()
+    cases["createInverseBezierCurve"] = lambda: createInverseBezierCurve(fv_curve)
+    #inverse force-velocity curve: Newton on u (BezierCurve) against the quintic Hermite table (CurveTable)
+    inverse_fv = BezierCurve(createInverseBezierCurve(fv_curve))
+    inverse_fv_table = CurveTable(inverse_fv.params())
+    fv = 0.5*(inverse_fv.xmin+inverse_fv.xmax)
+    fv_batch = np.linspace(inverse_fv.xmin, inverse_fv.xmax, batch_size)
+    cases["inverseForceVelocity[BezierCurve]/scalar"] = lambda: inverse_fv(fv)
+    cases["inverseForceVelocity[BezierCurve]/batch"] = lambda: inverse_fv(fv_batch)
+    cases["inverseForceVelocity[CurveTable]/scalar"] = lambda: inverse_fv_table(fv)
+    cases["inverseForceVelocity[CurveTable]/batch"] = lambda: inverse_fv_table(fv_batch)
+    cases["BezierCurve"] = lambda: BezierCurve(curve)
+    return cases
+
+#Best time per call in seconds over `repeat` runs; the number of calls per run is chosen so that one run lasts
+#about `min_time` seconds
+def time_case(fcn, repeat=5, min_time=0.1):
+    timer = timeit.Timer(fcn)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number*min_time/max(elapsed, 0.2)))
+    best = min(timer.repeat(repeat=repeat, number=number))/number
+    return best, number
+
+def run(pattern=None, repeat=5, min_time=0.1, verbose=True):
+    results = {}
+    for name, fcn in make_cases().items():
+        if pattern is not None and pattern not in name:
+            continue
+        seconds, number = time_case(fcn, repeat, min_time)
+        results[name] = {"seconds": seconds, "number": number}
+        if verbose:
+            print("%-40s %12.3f us" % (name, seconds*1e6))
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results,
+    }
+
+#Cases that are more than `threshold` (relative) slower than in the baseline: name -> (baseline, current, ratio)
+def compare(current, baseline, threshold=0.2):
+    regressions = {}
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        reference = baseline["results"][name]["seconds"]
+        ratio = result["seconds"]/reference
+        if ratio > 1+threshold:
+            regressions[name] = (reference, result["seconds"], ratio)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the muscle and curve hot paths")
+    parser.add_argument("-k", "--filter", default=None, help="only run the cases whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs per case, the best one is kept")
+    parser.add_argument("--min-time", type=float, default=0.1, help="approximate duration of one run, in seconds")
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("--save-baseline", default=None, help="write the results to this JSON file as the new baseline")
+    parser.add_argument("--baseline", default=None, help="compare the results with this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    current = run(args.filter, args.repeat, args.min_time)
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(current, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        for name, result in current["results"].items():
+            if name in baseline["results"]:
+                print("%-40s x%.2f" % (name, result["seconds"]/baseline["results"][name]["seconds"]))
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print("\n%d regression(s) above %.0f%%:" % (len(regressions), 100*args.threshold))
+            for name, (reference, seconds, ratio) in regressions.items():
+                print("%-40s %12.3f us -> %12.3f us (x%.2f)" % (name, reference*1e6, seconds*1e6, ratio))
+            sys.exit(1)
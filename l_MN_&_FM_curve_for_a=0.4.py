@@ -67,7 +67,7 @@ v_max = 10
 
 # Solving for the muscle length using differential equation
 def l_MN_calculation(l_MT, l_MN):
-    sol = solve_ivp(lambda t,l_MN:ode_DG(t, l_MN, l_MT, activation, l0_M, alpha0, ls_T, v_max),[0, t_simulation],[l_MN],methode="Radau",rtol=1e-6, atol=1e-6, t_eval= np.linspace(0, t_simulation, int(t_simulation*2000)), dense_output=True)
+    sol = solve_ivp(lambda t,l_MN:ode_DG(t, l_MN, l_MT, activation, l0_M, alpha0, ls_T, v_max),[0, t_simulation],[l_MN],method="Radau",jac=lambda t,l_MN:np.diag(ode_DG_jac(t, l_MN, l_MT, activation, l0_M, alpha0, ls_T, v_max)),rtol=1e-6, atol=1e-6, t_eval= np.linspace(0, t_simulation, int(t_simulation*2000)), dense_output=True)
     l_MN = sol.y[0][-1]
     return l_MN
 
@@ -75,18 +75,12 @@ def l_MN_calculation(l_MT, l_MN):
 plt.ion()
 plt.show()
 
-#the first while loop is just for calculating an intial muscle lentgh
+#the intial muscle length is the static equilibrium of the fiber
 t = 0
-while True:
-    l_MT = calc_l_MT(t,l0_M,ls_T,alpha0,c2)
-    # Intial values for l_MT and l_MN
-    sol = solve_ivp(lambda t,l_MN:ode_DG(t, l_MN, l_MT, activation, l0_M, alpha0, ls_T, v_max),[0, 0.02],[1],methode="Radau",rtol=1e-6, atol=1e-6, t_eval= np.linspace(0, 0.02, int(0.2*2000)), dense_output=True)
-    l_MN = sol.y[0][-1]
-    FM = FM_calc(l_MN,activation)
-    t+=0.01
-    if t>0.05:
-        success = False
-    break
+l_MT = calc_l_MT(t,l0_M,ls_T,alpha0,c2)
+l_MN = equilibrate(l_MT, activation, l0_M, alpha0, ls_T)
+FM = FM_calc(l_MN,activation)
+t+=0.01
 
 #while loop to calculate at each time all the parameters
 while True:
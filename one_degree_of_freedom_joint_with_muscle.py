@@ -0,0 +1,275 @@
+import pinocchio as pin
+import hppfcl as fcl
+import math
+import time
+import sys
+import argparse
+from Muscle_utils_pinocchio import *
+from Loop_Timer import PhaseTimer, NullTimer
+from Trajectory_Recorder import TrajectoryRecorder, ArrayRecorder
+from Async_Viewer import AsyncViewer
+
+#Shared code of the 1-DOF joint driven by one muscle (one_degree_of_freedom_joint_with_muscle_*.py).
+#
+#simulate() runs either with the Meshcat viewer, paced at real time, or headless as fast as possible:
+#
+#    model, geom_model = build_model()
+#    t, q, v, l_MN, FM, torque = simulate(model, T=10, dt=0.01, F_0m=190)
+
+phases = ["forward_kinematics", "muscle_path", "muscle_solve", "torque", "aba", "integration", "display"]
+
+#Pendulum of N bodies (only the second joint is actuated by the muscle), with an optional cart at its base
+def build_model(N=3, with_cart=False):
+    model = pin.Model()
+    geom_model = pin.GeometryModel()
+
+    parent_id = 0
+
+    if with_cart:
+        cart_radius = 0.1
+        cart_length = 5 * cart_radius
+        cart_mass = 2.
+        joint_name = "joint_cart"
+
+        geometry_placement = pin.SE3.Identity()
+        geometry_placement.rotation = pin.Quaternion(np.array([0.,1.,0.]),np.array([1.,0.,0.])).toRotationMatrix()
+
+        joint_id = model.addJoint(parent_id, pin.JointModelPY(), pin.SE3.Identity(), joint_name)
+
+        body_inertia = pin.Inertia.FromCylinder(cart_mass,cart_radius,cart_length)
+        body_placement = geometry_placement
+        model.appendBodyToJoint(joint_id,body_inertia,body_placement) # We need to rotate the inertia as it is expressed in the LOCAL frame of the geometry
+
+        shape_cart = fcl.Cylinder(cart_radius, cart_length)
+
+        geom_cart = pin.GeometryObject("shape_cart", joint_id, shape_cart, geometry_placement)
+        geom_cart.meshColor = np.array([1.,0.1,0.1,1.])
+        geom_model.addGeometryObject(geom_cart)
+
+        parent_id = joint_id
+    else:
+        base_radius = 0.2
+        shape_base = fcl.Sphere(base_radius)
+        geom_base = pin.GeometryObject("base", 0, shape_base, pin.SE3.Identity())
+        geom_base.meshColor = np.array([1.,0.1,0.1,1.])
+        geom_model.addGeometryObject(geom_base)
+
+    joint_placement = pin.SE3.Identity()
+    body_mass = 1.
+    body_radius = 0.1
+
+    for k in range(N):
+        body_placement = joint_placement.copy()
+        body_placement.translation[2] = -1.
+        joint_id = 0
+        if k == 1:
+            joint_name = "joint_" + str(k+1)
+            joint_id = model.addJoint(parent_id, pin.JointModelRX(), joint_placement, joint_name)
+            body_inertia = pin.Inertia.FromSphere(body_mass,body_radius)
+            model.appendBodyToJoint(joint_id,body_inertia,body_placement)
+        if k == 2:
+            parent_id = 1
+            joint_name = "joint_" + str(k+1)
+            joint_id = model.addJoint(parent_id, pin.JointModelRX(), joint_placement, joint_name)
+            body_inertia = pin.Inertia.FromSphere(body_mass,body_radius)
+            model.appendBodyToJoint(joint_id,body_inertia,body_placement)
+        if k != 2:
+            geom1_name = "ball_" + str(k+1)
+            shape1 = fcl.Sphere(body_radius)
+            geom1_obj = pin.GeometryObject(geom1_name, joint_id, shape1, body_placement)
+            geom1_obj.meshColor = np.ones((4))
+            geom_model.addGeometryObject(geom1_obj)
+
+            geom2_name = "bar_" + str(k+1)
+            shape2 = fcl.Cylinder(body_radius/4.,body_placement.translation[2])
+            shape2_placement = body_placement.copy()
+            shape2_placement.translation[2] /= 2.
+            geom2_obj = pin.GeometryObject(geom2_name, joint_id, shape2, shape2_placement)
+            geom2_obj.meshColor = np.array([0.,0.,0.,1.])
+            geom_model.addGeometryObject(geom2_obj)
+
+            parent_id = joint_id
+            joint_placement = body_placement.copy()
+
+    model.lowerPositionLimit.fill(-math.pi)
+    model.upperPositionLimit.fill(+math.pi)
+
+    if with_cart:
+        model.lowerPositionLimit[0] = model.upperPositionLimit[0] = 0.
+
+    return model, geom_model
+
+#Meshcat viewer of the model, or exits if it cannot be started
+def init_viewer(model, geom_model):
+    from pinocchio.visualize import MeshcatVisualizer as Visualizer
+
+    visual_model = geom_model
+    viz = Visualizer(model, geom_model, visual_model)
+
+    # Initialize the viewer.
+    try:
+        viz.initViewer()
+    except ImportError as err:
+        print("Error while initializing the viewer. It seems you should install gepetto-viewer")
+        print(err)
+        sys.exit(0)
+
+    try:
+        viz.loadViewerModel("pinocchio")
+    except AttributeError as err:
+        print("Error while loading the viewer model. It seems you should start gepetto-viewer")
+        print(err)
+        sys.exit(0)
+
+    return viz
+
+#Columns pushed by simulate into its recorder, with the shape of one sample; l_MT is the muscle-tendon length
+def trajectory_columns(model):
+    return {"t": (), "q": (model.nq,), "v": (model.nv,), "l_MN": (), "FM": (), "torque": (), "l_MT": ()}
+
+#Simulates T seconds of the pendulum driven by the muscle with steps of dt.
+#With a viewer, the configuration is displayed at each step (an AsyncViewer makes that non-blocking) and the loop is
+#paced at real time; without one, it runs as fast as possible. timer is a PhaseTimer (default: no timing). The muscle parameters and the joint damping
+#default to the ones of Muscle_utils_pinocchio and of the original scripts.
+#Returns the arrays (t, q, v, l_MN, FM, torque); row k holds the time and the state at the start of step k, and the
+#fiber length, normalized muscle force and joint torque computed during that step.
+#With a recorder (e.g. a TrajectoryRecorder over trajectory_columns(model)), the steps are streamed into it instead of
+#being kept in memory, and the flushed recorder is returned.
+def simulate(model, T=1000, dt=0.01, F_0m=190, activation=activation, muscle_integrator="adaptive", q0=None, viz=None, timer=None, recorder=None,
+             l0_M=l0_M, ls_T=ls_T, alpha0=alpha0, v_max=v_max, damping_value=0.5):
+    if q0 is None:
+        q0 = np.array([np.pi/2, 0]) #starting position
+    if timer is None:
+        timer = NullTimer()
+    data = model.createData()
+
+    n_steps = math.floor(T/dt)
+    log = recorder if recorder is not None else ArrayRecorder(trajectory_columns(model), n_steps)
+
+    t = 0.
+    q = np.array(q0, dtype=float)
+    v = np.zeros((model.nv))
+    tau_control = np.zeros((model.nv))
+
+    index_origin = 0
+    position_origin = data.oMi[index_origin].translation
+
+    index_second_joint = 1
+    index_end_effector = 2
+
+    distance_insertion_to_second_joint = 0.2
+    muscle = None
+
+    if viz is not None:
+        viz.display(q)
+
+    for k in range(n_steps):
+        t_step = time.perf_counter()
+        timer.start()
+        pin.forwardKinematics(model,data, q)
+        timer.lap("forward_kinematics")
+        position_second_joint = data.oMi[index_second_joint].translation
+
+        position_end_effector = data.oMi[index_end_effector].translation
+
+        length_2nd_joint_to_end_effector = np.absolute(np.linalg.norm(position_end_effector-position_second_joint))
+        position_insertion = pos_inse(position_second_joint, distance_insertion_to_second_joint, position_end_effector, length_2nd_joint_to_end_effector)
+
+        muscle_tendon_length = np.absolute(np.linalg.norm(position_origin-position_insertion))
+        timer.lap("muscle_path")
+        if muscle is None:
+            # start the fiber on its static equilibrium for the initial pose
+            l_MN = equilibrate(muscle_tendon_length, activation, l0_M, alpha0, ls_T)
+            muscle = make_muscle(muscle_integrator, l_MN, activation, dt, l0_M, alpha0, ls_T, v_max)
+        FM = muscle.step(muscle_tendon_length)
+        timer.lap("muscle_solve")
+
+        FM_vector = -F_0m *FM*((position_origin - position_second_joint) - (position_insertion - position_second_joint))
+
+        distance_from_2nd_joint_to_insertion = position_origin - position_insertion
+        torq = FM_vector[2]*distance_from_2nd_joint_to_insertion[1]
+        torq_v = np.array([torq,0])
+        log.push(t, q, v, muscle.l_MN, FM, torq, muscle_tendon_length)
+        timer.lap("torque")
+
+        tau_control = -damping_value * v + torq_v # small damping
+        a = pin.aba(model,data,q,v,tau_control) # Forward dynamics
+        timer.lap("aba")
+
+        # Semi-explicit integration
+        v += a*dt
+        q = pin.integrate(model,q,v*dt) # Configuration integration
+        timer.lap("integration")
+
+        if viz is not None:
+            viz.display(q)
+            timer.lap("display")
+            timer.stop()
+            # the whole step, muscle solve included, counts against the real-time budget; paced on the wall clock
+            # so that it does not depend on the timer (a NullTimer when the timing summary is off)
+            time.sleep(max(0., dt-(time.perf_counter()-t_step)))
+        else:
+            timer.stop()
+        t += dt
+
+    if recorder is not None:
+        recorder.flush()
+        return recorder
+    t_log, q_log, v_log, l_MN_log, FM_log, torque_log, l_MT_log = log.buffers
+    return t_log, q_log, v_log, l_MN_log, FM_log, torque_log
+
+#Command line of the 1-DOF scripts; F_0m is the default maximal isometric force of the muscle
+def main(F_0m):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--with-cart", help="Add a cart at the base of the pendulum to simulate a cart pole system.",
+                        action="store_true")
+    parser.add_argument("-N", help="Number of pendulums compositing the dynamical system.",
+                        type=int, default=3)
+    parser.add_argument("--muscle-integrator", help="Integrator of the muscle fiber length: adaptive Rosenbrock, or a fixed-step implicit scheme with a bounded cost per step.",
+                        choices=["adaptive", "backward_euler", "trapezoidal"], default="adaptive")
+    parser.add_argument("--timing-summary", help="Print the per-phase timing summary every this many steps (0 to disable).",
+                        type=int, default=100)
+    parser.add_argument("--headless", help="Run without viewer nor real-time pacing, as fast as possible.",
+                        action="store_true")
+    parser.add_argument("-T", help="Simulated time in seconds.", type=float, default=1000)
+    parser.add_argument("--dt", help="Time step in seconds.", type=float, default=0.01)
+    parser.add_argument("--F0m", help="Maximal isometric force of the muscle.", type=float, default=F_0m)
+    parser.add_argument("--activation", help="Muscle activation, in [0,1].", type=float, default=activation)
+    parser.add_argument("--output", help="Save the (t, q, v, l_MN, FM, torque) arrays to this .npz file.")
+    parser.add_argument("--record", help="Stream the trajectory to chunked .npz files in this directory instead of keeping it in memory (see Trajectory_Recorder).")
+    parser.add_argument("--chunk-size", help="Number of steps per chunk of --record.", type=int, default=1000)
+    parser.add_argument("--fps", help="Frame rate of the viewer, updated from a background thread (0 to display every step synchronously).",
+                        type=float, default=30)
+    args = parser.parse_args()
+
+    model, geom_model = build_model(args.N, args.with_cart)
+    viz = None
+    if not args.headless:
+        viz = init_viewer(model, geom_model)
+        if args.fps:
+            viz = AsyncViewer(viz, args.fps)
+    timer = None
+    if args.timing_summary:
+        # headless runs only print the summary once, at the end
+        timer = PhaseTimer(phases, args.dt, report_every=0 if args.headless else args.timing_summary)
+
+    recorder = None
+    if args.record:
+        recorder = TrajectoryRecorder(args.record, trajectory_columns(model), args.chunk_size)
+
+    tic = time.perf_counter()
+    result = simulate(model, args.T, args.dt, args.F0m, args.activation, args.muscle_integrator, viz=viz, timer=timer, recorder=recorder)
+    if args.headless:
+        elapsed = time.perf_counter()-tic
+        n_steps = math.floor(args.T/args.dt)
+        print("%d steps in %.2f s (%.0fx real time)" % (n_steps, elapsed, n_steps*args.dt/elapsed))
+        if timer is not None:
+            print(timer.summary())
+    if isinstance(viz, AsyncViewer):
+        viz.close()
+    if recorder is not None:
+        recorder.close()
+    elif args.output:
+        t, q, v, l_MN, FM, torque = result
+        np.savez(args.output, t=t, q=q, v=v, l_MN=l_MN, FM=FM, torque=torque)
+    return result
@@ -0,0 +1,18 @@
+import math
+import pytest
+from Parameter_Sweep import sweep
+
+#fiber cases that leave the domain of ode_DG, by integrator: the trial fiber lengths of the adaptive one overflow
+#(OverflowError in ode_DG), the fixed-step ones end on an infinite fiber velocity
+diverging = {"adaptive": {"l0_M": 0.2, "ls_T": 0.1, "activation": 0.01, "v_max": 1.},
+             "backward_euler": {"l0_M": 0.2, "ls_T": 0.1, "activation": 0.01, "v_max": 10.},
+             "trapezoidal": {"l0_M": 0.2, "ls_T": 0.1, "activation": 0.01, "v_max": 10.}}
+
+@pytest.mark.parametrize("processes", [1, 2])
+@pytest.mark.parametrize("muscle_integrator", ["adaptive", "backward_euler", "trapezoidal"])
+def test_diverging_case_gets_a_failed_row(muscle_integrator, processes):
+    rows = sweep("fiber", [diverging[muscle_integrator], {}], processes=processes, muscle_integrator=muscle_integrator)
+    assert rows[0]["status"].startswith("failed: ")
+    assert "l_MN_final" not in rows[0]
+    assert rows[1]["status"] == "ok"
+    assert math.isfinite(rows[1]["l_MN_final"])
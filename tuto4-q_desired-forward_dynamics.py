@@ -3,6 +3,7 @@ import example_robot_data as robex
 import pinocchio as pin
 import numpy as np
 import time
+from Async_Viewer import AsyncViewer
 
 name = "talos_arm"
 robot = robex.load(name, rootNodeName="talos_arm")
@@ -10,6 +11,7 @@ robot = robex.load(name, rootNodeName="talos_arm")
 Viewer = pin.visualize.MeshcatVisualizer
 viz = Viewer(robot.model, robot.collision_model, robot.visual_model)
 viz.initViewer(loadModel=True)
+viz = AsyncViewer(viz, fps=30) # displays at 30 Hz from a background thread instead of every step
 q = np.array([0, 0, 0.2, 0, 0, 0.3,0])*np.pi
 qdes = np.array([0, 0, 0.5, 0, 0, 0.8,0])*np.pi
 v = np.zeros(robot.model.nv)
@@ -21,6 +23,8 @@ Kv = 2 * np.sqrt(Kp)
 viz.display(qdes)
 time.sleep(4)
 
+t = 0.
+t_start = time.perf_counter()
 while True :
     torq = -Kp * (q - qdes) - Kv * v
     # b = pin.nle(robot.model, robot.data, q, v)
@@ -30,3 +34,8 @@ while True :
     v += a_free * dt
     q = pin.integrate(robot.model, q, v * dt)
     viz.display(q)
+    # the display no longer slows the loop down: keep the simulated time on the wall clock
+    t += dt
+    ahead = t - (time.perf_counter() - t_start)
+    if ahead > 0.005:
+        time.sleep(ahead)